@@ -0,0 +1,26 @@
+import streamlit as st
+import workbook_cache
+
+# Single entry point: every view lives under pages/ and shares this process,
+# so a workbook parsed by one page (or one browser session) is reused by all.
+
+def main():
+    st.set_page_config(page_title='Sahyadri Rejection Analysis', page_icon='📊')
+    st.title('📊 Sahyadri Rejection Analysis')
+    st.markdown(
+        "Pick a view in the sidebar:\n\n"
+        "- **Rejection Trend** – daily rejection % from the 'Stamping Rej' sheet\n"
+        "- **Rejection Breakdown** – top rejection types for the month\n"
+        "- **Size wise Rejection** – rejection by thickness from the 'Size wise Rej' sheet\n"
+        "- **Upload Analysis** – trend and breakdown of an uploaded workbook"
+    )
+    
+    # The parsed workbooks are shared by all pages and sessions of this server
+    stats = workbook_cache.stats()
+    st.sidebar.caption(f"Cached results: {stats['entries']} ({stats['bytes'] / 1e6:.1f} MB)")
+    if st.sidebar.button('Clear cached workbooks'):
+        workbook_cache.evict()
+        st.rerun()
+
+if __name__ == '__main__':
+    main()
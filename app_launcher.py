@@ -1,19 +1,25 @@
-import os
+import sys
 import webbrowser
 import subprocess
 import time
+import urllib.request
 
-# List of Streamlit apps to run
-apps = [
-    "finale2.py",
-    "size_wise_rej.py",
-    "new_proj.py"  # Add more if needed
-]
+# All views are pages of app.py, so a single Streamlit server is started
+app = "app.py"
+port = 8501
 
-# Open a new browser tab for each app
-for index, app in enumerate(apps):
-    port = 8501 + index  # Assign different ports to each app
-    command = f"start /b streamlit run {app} --server.port {port}"  # Run in background
-    subprocess.Popen(command, shell=True)
-    time.sleep(2)  # Small delay to allow app startup
-    webbrowser.open(f"http://localhost:{port}")  # Open in browser
+# --warm-up preloads the modules and parses the workbook before the server takes requests
+if "--warm-up" in sys.argv[1:]:
+    command = [sys.executable, "warmup.py", "--server.port", str(port)]
+else:
+    command = [sys.executable, "-m", "streamlit", "run", app, "--server.port", str(port)]
+subprocess.Popen(command)  # Run in background
+
+# Wait until the server answers, which takes longer with the warm-up
+for _ in range(120):
+    try:
+        urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1)
+        break
+    except OSError:
+        time.sleep(0.5)
+webbrowser.open(f"http://localhost:{port}")  # Open in browser
@@ -1,18 +1,23 @@
 #!/bin/bash
 
-# List of Streamlit apps
-APPS=("finale_2.py" "new_proj.py" "size_wise_rej.py")  # Add more apps if needed
-PORT=8501  # Starting port
+# All views run as pages of one Streamlit app, so one server is enough
+APP="app.py"
+PORT=8501
 
-# Open each app in a new process
-for APP in "${APPS[@]}"; do
-    echo "Starting $APP on port $PORT..."
+echo "Starting $APP on port $PORT..."
+if [ "$1" = "--warm-up" ]; then
+    # Preload the modules and parse the workbook before the server takes requests
+    python warmup.py --server.port $PORT >/dev/null 2>&1 &
+else
     streamlit run "$APP" --server.port $PORT >/dev/null 2>&1 &
-    sleep 2  # Give it some time to start
-    xdg-open "http://localhost:$PORT"  # Open in browser
-    ((PORT++))
+fi
+# Wait until the server answers
+for _ in $(seq 1 60); do
+    curl -s "http://localhost:$PORT/_stcore/health" >/dev/null && break
+    sleep 0.5
 done
+xdg-open "http://localhost:$PORT"  # Open in browser
 
-echo "All apps started!"
+echo "App started!"
 
-#UNDER PROCESSSS
\ No newline at end of file
+#UNDER PROCESSSS
@@ -0,0 +1,156 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cleaning
+import column_mapping
+import main_final
+import size_wise_rej
+import spc
+import stats_cube
+
+WORKBOOK_PATTERNS = ('*.ods', '*.xlsx')
+
+
+def _write_table(df, out_dir, name, formats):
+    for fmt in formats:
+        path = os.path.join(out_dir, f'{name}.{fmt}')
+        if fmt == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+
+
+def _write_chart(fig, out_dir, name):
+    # Plotly.js comes from the CDN so each chart stays a few KB
+    fig.write_html(os.path.join(out_dir, f'{name}.html'), include_plotlyjs='cdn')
+
+
+def report_workbook(path, out_root, formats):
+    """
+    Build every table and chart for one workbook into <out_root>/<workbook file name>/.
+    The extension stays in the folder name, so march.ods and march.xlsx get
+    separate folders. Runs in a worker process; returns a summary dict
+    instead of raising.
+    """
+    start = time.perf_counter()
+    out_dir = os.path.join(out_root, os.path.basename(path))
+    summary = {'path': path, 'out_dir': out_dir, 'tables': {}, 'notes': []}
+    try:
+        os.makedirs(out_dir, exist_ok=True)
+
+        stamping = main_final.load_stamping_rej(path)
+        if stamping is None:
+            summary['notes'].append("Sheet 'Stamping Rej' not found")
+        else:
+            trend_df, (rejection_df, _, _, total_rejection_percentage), daily_df = stamping
+            if trend_df is not None:
+                _write_table(trend_df, out_dir, 'trend', formats)
+                control_df, _ = spc.evaluate(trend_df, 'Date', 'Rejection %')
+                _write_chart(main_final.trend_figure(trend_df, control_df), out_dir, 'trend')
+                summary['tables']['trend'] = len(trend_df)
+            _write_table(rejection_df, out_dir, 'breakdown', formats)
+            _write_chart(main_final.breakdown_figure(rejection_df, total_rejection_percentage), out_dir, 'breakdown')
+            summary['tables']['breakdown'] = len(rejection_df)
+            if daily_df is not None:
+                _write_table(daily_df, out_dir, 'daily_breakdown', formats)
+                summary['tables']['daily_breakdown'] = len(daily_df)
+
+        size_wise = size_wise_rej.read_raw_sheet_data(path)
+        if size_wise is None:
+            summary['notes'].append("Sheet 'Size wise Rej' not found")
+        else:
+            raw_data, headers = size_wise
+            # Headless runs never call the LLM; unmatched layouts need a saved mapping
+            column_map, _, _ = column_mapping.resolve_columns(raw_data, headers)
+            if column_map is None:
+                summary['notes'].append("Size wise Rej columns could not be matched")
+            else:
+                processed_df, rejected_df, _ = cleaning.clean_size_wise_rows(raw_data, column_map)
+                cube = stats_cube.build_cube(processed_df)
+                thickness_stats = stats_cube.thickness_statistics(cube)
+                _write_table(processed_df, out_dir, 'size_wise', formats)
+                _write_table(thickness_stats, out_dir, 'thickness_stats', formats)
+                if not rejected_df.empty:
+                    _write_table(rejected_df, out_dir, 'size_wise_rejected', formats)
+                if not processed_df.empty:
+                    _write_chart(size_wise_rej.thickness_trend_figure(cube), out_dir, 'thickness_trend')
+                    _write_chart(size_wise_rej.scatter_3d_figure(processed_df), out_dir, 'thickness_scatter_3d')
+                summary['tables']['size_wise'] = len(processed_df)
+                summary['tables']['thickness_stats'] = len(thickness_stats)
+        summary['ok'] = True
+    except Exception as e:
+        summary['ok'] = False
+        summary['error'] = f'{type(e).__name__}: {e}'
+        summary['traceback'] = traceback.format_exc()
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def find_workbooks(directory):
+    paths = []
+    for pattern in WORKBOOK_PATTERNS:
+        paths.extend(glob.glob(os.path.join(directory, pattern)))
+    return sorted(paths)
+
+
+def run_batch(paths, out_root, formats=('parquet',), jobs=None):
+    """Report every workbook in a process pool; returns the run summary."""
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(report_workbook, path, out_root, formats) for path in paths]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            status = 'ok' if result['ok'] else f"FAILED ({result['error']})"
+            print(f"{result['path']}: {status} in {result['seconds']:.2f}s", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    failed = [r for r in results if not r['ok']]
+    return {
+        'workbooks': len(results),
+        'succeeded': len(results) - len(failed),
+        'failed': len(failed),
+        'elapsed_seconds': elapsed,
+        'workbooks_per_second': len(results) / elapsed if elapsed else 0.0,
+        'rows_written': sum(sum(r['tables'].values()) for r in results),
+        'results': sorted(results, key=lambda r: r['path']),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write rejection reports for a directory of workbooks')
+    parser.add_argument('input_dir', help='directory containing the workbooks')
+    parser.add_argument('output_dir', help='one sub-directory per workbook is written here')
+    parser.add_argument('--format', nargs='+', choices=['parquet', 'csv'], default=['parquet'], dest='formats')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+    args = parser.parse_args(argv)
+
+    paths = find_workbooks(args.input_dir)
+    if not paths:
+        print(f"No workbooks found in {args.input_dir}", file=sys.stderr)
+        return 1
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    summary = run_batch(paths, args.output_dir, args.formats, args.jobs)
+    with open(os.path.join(args.output_dir, 'summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"{summary['succeeded']}/{summary['workbooks']} workbooks in {summary['elapsed_seconds']:.2f}s "
+          f"({summary['workbooks_per_second']:.2f}/s, {summary['rows_written']} rows written)")
+    for result in summary['results']:
+        if not result['ok']:
+            print(f"  FAILED {result['path']}: {result['error']}")
+        for note in result['notes']:
+            print(f"  {result['path']}: {note}")
+    return 0 if not summary['failed'] else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Drive N concurrent dashboard sessions in one process, the way one Streamlit
+server shares its workbook cache and CPU between browser tabs, and report
+throughput, p50/p95 step latency and memory for each session count.
+
+    python -m benchmarks.load_test [--sessions 1 4 16] [--rows 5000] [--distinct-uploads] [--llm-latency 1.0]
+
+Every session uploads a synthetic workbook on the upload page, opens the
+trend page, opens the size-wise page, switches to its processing view,
+changes the statistics window and switches to its charts.
+Sessions are driven with streamlit.testing's AppTest. The Anthropic SDK is
+replaced by column_mapping.StubClient, so no request leaves the machine.
+"""
+import argparse
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import types
+from datetime import datetime, timedelta
+
+import column_mapping
+import instrumentation
+import workbook_cache
+from benchmarks.synthetic_workbook import write_workbook
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'load_results.jsonl')
+PAGES = {
+    'upload': os.path.join(ROOT, 'pages', '4_📂_Upload_Analysis.py'),
+    'trend': os.path.join(ROOT, 'pages', '1_📈_Rejection_Trend.py'),
+    'size_wise': os.path.join(ROOT, 'pages', '3_📐_Size_wise_Rejection.py'),
+}
+STEPS = ('upload', 'trend', 'size_wise', 'size_wise processing', 'size_wise window', 'size_wise charts')
+# Session state key holding (bytes, file name) of the workbook a session uploads
+UPLOAD_KEY = 'load_test_upload'
+# Seconds a single page run may take before it counts as failed
+RUN_TIMEOUT = 300
+
+
+def _session_upload(label, *args, **kwargs):
+    """AppTest cannot drive st.file_uploader, so each session's workbook is handed to the page as its upload."""
+    import streamlit as st
+    upload = st.session_state.get(UPLOAD_KEY)
+    if upload is None:
+        return None
+    data, name = upload
+    buffer = io.BytesIO(data)
+    buffer.name = name
+    return buffer
+
+
+def _install_stubs(llm_latency):
+    """Route st.file_uploader and the Anthropic client of every page to the load test."""
+    import streamlit as st
+    st.file_uploader = _session_upload
+    anthropic = types.ModuleType('anthropic')
+    anthropic.Anthropic = lambda: column_mapping.StubClient(latency=llm_latency)
+    sys.modules['anthropic'] = anthropic
+
+
+def _share_runtime():
+    """
+    AppTest installs a mock Runtime for each run and clears it when the run
+    ends, which breaks the runs of other sessions still in flight; every
+    session gets one shared mock Runtime instead, as they would share the server's.
+    """
+    from unittest.mock import MagicMock
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage('/mock/media'))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+    # Sessions set their upload before a script run exists; that is expected here
+    logging.getLogger('streamlit.runtime.scriptrunner.script_run_context').addFilter(
+        lambda record: 'missing ScriptRunContext' not in record.getMessage())
+
+
+def _rss_bytes():
+    """Resident memory of this process (peak resident memory where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_session(upload, timings, errors, barrier):
+    """One simulated user: upload, trend, then the size-wise views and a new statistics window."""
+    from streamlit.testing.v1 import AppTest
+
+    def step(name, run):
+        start = time.perf_counter()
+        try:
+            app = run()
+        except Exception as e:
+            errors.append(f'{name}: {e!r}')
+            return None
+        timings.append((name, time.perf_counter() - start))
+        if app.exception:
+            errors.append(f'{name}: {app.exception[0].value}')
+        return app
+
+    barrier.wait()
+    upload_page = AppTest.from_file(PAGES['upload'], default_timeout=RUN_TIMEOUT)
+    upload_page.session_state[UPLOAD_KEY] = upload
+    step('upload', upload_page.run)
+    step('trend', AppTest.from_file(PAGES['trend'], default_timeout=RUN_TIMEOUT).run)
+    size_wise = step('size_wise', AppTest.from_file(PAGES['size_wise'], default_timeout=RUN_TIMEOUT).run)
+    if size_wise is None:
+        return
+    size_wise = step('size_wise processing', size_wise.radio(key='size_wise_view').set_value('Data Processing').run)
+    windows = [widget for widget in size_wise.date_input if widget.key == 'stats_window'] if size_wise else []
+    if windows:
+        first_day = windows[0].value[0]
+        size_wise = step('size_wise window', windows[0].set_value((first_day, first_day + timedelta(days=6))).run)
+    if size_wise is not None:
+        step('size_wise charts', size_wise.radio(key='size_wise_view').set_value('Data Visualization').run)
+
+
+def run_level(sessions, uploads):
+    """Run `sessions` concurrent sessions from a cold workbook cache; returns the level's report."""
+    workbook_cache.evict()
+    gc.collect()
+    rss_before = _rss_bytes()
+    timings, errors = [], []
+    barrier = threading.Barrier(sessions)
+    threads = [threading.Thread(target=run_session, args=(uploads[i % len(uploads)], timings, errors, barrier))
+               for i in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    rss_after = _rss_bytes()
+
+    seconds = [duration for _, duration in timings]
+    report = {
+        'sessions': sessions,
+        'steps': len(timings),
+        'errors': errors,
+        'elapsed': elapsed,
+        'steps_per_second': len(timings) / elapsed,
+        'sessions_per_minute': sessions / elapsed * 60,
+        'p50': statistics.median(seconds) if seconds else None,
+        'p95': _percentile(seconds, 0.95) if seconds else None,
+        'rss_mb': rss_after / 1e6,
+        'rss_growth_mb_per_session': (rss_after - rss_before) / 1e6 / sessions,
+        'step_p95': {},
+    }
+    for name in STEPS:
+        durations = [duration for step, duration in timings if step == name]
+        if durations:
+            report['step_p95'][name] = _percentile(durations, 0.95)
+    return report
+
+
+def run(session_counts, rows, cols, distinct_uploads, llm_latency, results_path=RESULTS_PATH):
+    with tempfile.TemporaryDirectory() as workdir:
+        # The trend and size-wise pages read SAHYADRI_WORKBOOK; uploads are separate files
+        shared = write_workbook(os.path.join(workdir, 'shared.ods'), size_rows=rows, size_cols=cols)
+        os.environ['SAHYADRI_WORKBOOK'] = shared
+        instrumentation.LOG_PATH = os.path.join(workdir, 'timings.jsonl')
+        _install_stubs(llm_latency)
+        _share_runtime()
+
+        upload_count = max(session_counts) if distinct_uploads else 1
+        uploads = []
+        for seed in range(upload_count):
+            path = write_workbook(os.path.join(workdir, f'upload_{seed}.ods'), size_rows=rows, size_cols=cols, seed=seed)
+            with open(path, 'rb') as f:
+                uploads.append((f.read(), os.path.basename(path)))
+
+        reports = []
+        print(f"{'sessions':>8} {'steps/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'RSS MB':>8} {'MB/session':>10}  slowest step (p95)")
+        for sessions in session_counts:
+            report = run_level(sessions, uploads)
+            reports.append(report)
+            slowest = max(report['step_p95'].items(), key=lambda item: item[1], default=('-', 0))
+            print(f"{sessions:>8} {report['steps_per_second']:>8.2f} {(report['p50'] or 0) * 1000:>9.0f} "
+                  f"{(report['p95'] or 0) * 1000:>9.0f} {report['rss_mb']:>8.0f} "
+                  f"{report['rss_growth_mb_per_session']:>10.1f}  {slowest[0]} {slowest[1] * 1000:.0f} ms")
+            for error in report['errors'][:5]:
+                print(f'         error: {error}', file=sys.stderr)
+
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.node(),
+        'rows': rows,
+        'cols': cols,
+        'distinct_uploads': distinct_uploads,
+        'llm_latency': llm_latency,
+        'levels': reports,
+    }
+    with open(results_path, 'a') as f:
+        f.write(json.dumps(record) + '\n')
+    return reports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load-test the dashboards with concurrent simulated sessions')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4, 16], help='Concurrent session counts to run')
+    parser.add_argument('--rows', type=int, default=5000, help="'Size wise Rej' rows of the synthetic workbooks")
+    parser.add_argument('--cols', type=int, default=3, help="'Size wise Rej' columns")
+    parser.add_argument('--distinct-uploads', action='store_true',
+                        help='Give every session its own workbook to upload instead of the same one')
+    parser.add_argument('--llm-latency', type=float, default=1.0, help='Seconds the stub Anthropic client takes per call')
+    parser.add_argument('--results', default=RESULTS_PATH, help='JSONL file the run is appended to')
+    args = parser.parse_args(argv)
+    reports = run(args.sessions, args.rows, args.cols, args.distinct_uploads, args.llm_latency, args.results)
+    return 1 if any(report['errors'] for report in reports) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Time the loaders, the LLM column-mapping request (against a stub client with
+simulated latency), the size-wise pipeline and chart construction on synthetic
+workbooks of growing size, and keep every run in benchmarks/results.jsonl so
+regressions show up against the previous run.
+
+    python -m benchmarks.run_benchmarks [--sizes 1000 10000 50000] [--cols 3 20] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import breakdown_index
+import column_mapping
+import main_final
+import size_wise_rej
+import stats_cube
+import workbook_reader
+from benchmarks.synthetic_workbook import write_workbook
+
+RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results.jsonl')
+# Slower than the previous run by more than this fraction (and this many seconds) is flagged
+REGRESSION_THRESHOLD = 0.2
+REGRESSION_MIN_SECONDS = 0.005
+# Simulated LLM timing for the column-mapping request: fixed latency plus time per token
+LLM_LATENCY = {'latency': 0.3, 'input_token_seconds': 0.0002, 'output_token_seconds': 0.02}
+
+
+def _timed(func, repeat):
+    """Run func `repeat` times; returns (best, median) seconds and the last result."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings), result
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(RESULTS_PATH)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def benchmark_workbook(path, repeat):
+    """Yield (case, best, median, extra fields) for every stage on one workbook."""
+    best, median, cells = _timed(lambda: workbook_reader.read_ranges(path, 'Stamping Rej', main_final.STAMPING_RANGES), repeat)
+    yield 'read_ranges', best, median, {}
+
+    best, median, trend_df = _timed(lambda: main_final.load_rejection_trend_data(cells), repeat)
+    yield 'load_rejection_trend_data', best, median, {}
+    best, median, breakdown = _timed(lambda: main_final.load_rejection_breakdown_data(cells), repeat)
+    yield 'load_rejection_breakdown_data', best, median, {}
+    best, median, daily = _timed(lambda: main_final.load_daily_breakdown(cells), repeat)
+    yield 'load_daily_breakdown', best, median, {}
+    index = breakdown_index.BreakdownIndex(daily)
+    best, median, _ = _timed(lambda: index.top_n(5, index.dates[7], index.dates[13]), repeat)
+    yield 'breakdown_window_top_n', best, median, {}
+
+    best, median, (raw_data, headers) = _timed(lambda: size_wise_rej.read_raw_sheet_data(path), repeat)
+    yield 'load_raw_sheet_data', best, median, {}
+
+    column_map = column_mapping.match_columns(raw_data, headers)
+    # The stub answers like the model would, so the reply is parsed and validated as well
+    client = column_mapping.StubClient(reply=json.dumps(column_map), **LLM_LATENCY)
+    best, median, answer = _timed(lambda: size_wise_rej.preprocess_data_with_ai(raw_data, headers, client=client), repeat)
+    assert column_mapping.parse_mapping(answer, headers) == column_map
+    usage = client.usage[-1]
+    yield 'llm_column_mapping', best, median, {'input_tokens': usage.input_tokens, 'output_tokens': usage.output_tokens}
+
+    best, median, (processed_df, cube) = _timed(lambda: size_wise_rej.process_data_with_ai_guidance(raw_data, column_map, report=False), repeat)
+    yield 'process_data_with_ai_guidance', best, median, {}
+
+    best, median, _ = _timed(lambda: stats_cube.thickness_statistics(cube), repeat)
+    yield 'thickness_statistics', best, median, {}
+
+    charts = {
+        'trend_figure': lambda: main_final.trend_figure(trend_df),
+        'breakdown_figure': lambda: main_final.breakdown_figure(breakdown[0], breakdown[3]),
+        'scatter_3d_figure': lambda: size_wise_rej.scatter_3d_figure(processed_df),
+        'thickness_trend_figure': lambda: size_wise_rej.thickness_trend_figure(cube),
+    }
+    for name, build in charts.items():
+        # Serialising is what the browser payload costs, so it is part of the timing
+        best, median, _ = _timed(lambda: build().to_json(), repeat)
+        yield name, best, median, {}
+
+
+def _previous_results(path=RESULTS_PATH):
+    """Latest median recorded on this machine per (case, rows, cols, format)."""
+    previous = {}
+    if not os.path.exists(path):
+        return previous
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get('machine') != platform.node():
+                continue
+            for result in record['results']:
+                key = (result['case'], result['rows'], result['cols'], result['format'])
+                previous[key] = result['median']
+    return previous
+
+
+def run(sizes, cols_list, formats, repeat, results_path=RESULTS_PATH):
+    previous = _previous_results(results_path)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in sizes:
+            for cols in cols_list:
+                for fmt in formats:
+                    path = write_workbook(os.path.join(workdir, f'bench_{rows}_{cols}.{fmt}'), size_rows=rows, size_cols=cols)
+                    for case, best, median, extra in benchmark_workbook(path, repeat):
+                        key = (case, rows, cols, fmt)
+                        change = (median - previous[key]) / previous[key] if previous.get(key) else None
+                        regression = (change is not None and change > REGRESSION_THRESHOLD
+                                      and median - previous[key] > REGRESSION_MIN_SECONDS)
+                        results.append({'case': case, 'rows': rows, 'cols': cols, 'format': fmt,
+                                        'best': best, 'median': median, 'change': change, 'regression': regression, **extra})
+                        flag = ' REGRESSION' if regression else ''
+                        delta = f'{change:+.0%}' if change is not None else 'new'
+                        tokens = f"  {extra['input_tokens']} in / {extra['output_tokens']} out tokens" if 'input_tokens' in extra else ''
+                        print(f'{case:32} rows={rows:<7} cols={cols:<3} {median * 1000:10.2f} ms  {delta:>6}{flag}{tokens}')
+
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'machine': platform.node(),
+        'repeat': repeat,
+        'results': results,
+    }
+    with open(results_path, 'a') as f:
+        f.write(json.dumps(record) + '\n')
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the rejection loaders on synthetic workbooks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000], help="'Size wise Rej' rows")
+    parser.add_argument('--cols', type=int, nargs='+', default=[3, 20], help="'Size wise Rej' columns")
+    parser.add_argument('--formats', nargs='+', default=['ods'], choices=['ods', 'xlsx'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--results', default=RESULTS_PATH, help='JSONL file the run is appended to')
+    args = parser.parse_args(argv)
+    results = run(args.sizes, args.cols, args.formats, args.repeat, args.results)
+    return 1 if any(r['regression'] for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+Synthetic workbooks with the layouts the loaders expect.
+
+'Stamping Rej': dates in B17:B47, daily production in column C, the 21
+rejection types in D:X, the daily rejection % in Z and the month totals in
+row 50. 'Size wise Rej': a header row followed by Date / Thickness /
+Rejection % columns plus any number of extra columns, with the kind of
+mess (units, decimal commas, mixed date formats, blanks) found in real sheets.
+
+    python -m benchmarks.synthetic_workbook out.ods --rows 5000 --cols 20
+"""
+import argparse
+import random
+import zipfile
+from datetime import date, datetime, timedelta
+from xml.sax.saxutils import escape
+
+REJECTION_TYPES = [
+    'Layer Open', 'Water Mark', 'Extra Material', 'Bend', 'Edge Damage',
+    'TWM', 'VC', 'TC', 'Cutting Mist', 'Side Damage',
+    'Corner Damage', 'LT', 'FT', 'Surf Defect', 'Hole Damage',
+    'Temp Damage', 'Rolling Particle', 'TV', 'GSD', 'Brittle',
+    'Lab Sheet'
+]
+THICKNESSES = [0.5, 0.8, 1.0, 1.2, 1.5, 2.0, 2.5, 3.0]
+DATE_STYLES = ['%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d', '%d %b %Y']
+
+ODS_MIMETYPE = 'application/vnd.oasis.opendocument.spreadsheet'
+ODS_NAMESPACES = (
+    'xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+    'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" '
+    'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" '
+    'xmlns:style="urn:oasis:names:tc:opendocument:xmlns:style:1.0" '
+    'xmlns:meta="urn:oasis:names:tc:opendocument:xmlns:meta:1.0" '
+    'office:version="1.2"'
+)
+
+
+def stamping_rej_rows(month_start=date(2024, 3, 1), seed=0):
+    """Grid of the 'Stamping Rej' sheet for one month (always 31 date rows)."""
+    rng = random.Random(seed)
+    rows = [[None] * 26 for _ in range(50)]
+    rows[0][0] = 'Stamping Rejection Report'
+    rows[15][1] = 'Date'
+    rows[15][2] = 'Total Sheets'
+    for col, rej_type in enumerate(REJECTION_TYPES, start=3):
+        rows[15][col] = rej_type
+    rows[15][25] = 'Rejection %'
+
+    totals = [0.0] * 24
+    for i in range(31):
+        row = rows[16 + i]
+        day = month_start + timedelta(days=i)
+        row[1] = datetime(day.year, day.month, day.day)
+        # Sundays have no production and the sheet shows #DIV/0!
+        produced = 0.0 if day.weekday() == 6 else float(rng.randint(800, 1500))
+        row[2] = produced
+        rejected = 0.0
+        for col in range(3, 24):
+            count = float(rng.randint(0, 6)) if produced else 0.0
+            row[col] = count
+            rejected += count
+            totals[col] += count
+        totals[2] += produced
+        row[25] = rejected / produced * 100 if produced else '#DIV/0!'
+
+    rows[49][1] = 'Total'
+    for col in range(2, 24):
+        rows[49][col] = totals[col]
+    return rows
+
+
+def size_wise_rows(n_rows, n_cols=3, month_start=date(2024, 3, 1), seed=0):
+    """Grid of the 'Size wise Rej' sheet: a header plus n_rows messy data rows."""
+    rng = random.Random(seed)
+    header = ['Date', 'Thickness', 'Rejection %'] + [f'Size {k}' for k in range(3, max(n_cols, 3))]
+    rows = [header]
+    days = max(n_rows // len(THICKNESSES), 1)
+    date_style = DATE_STYLES[seed % len(DATE_STYLES)]
+    for i in range(n_rows):
+        if rng.random() < 0.01:
+            rows.append([None] * len(header))
+            continue
+        day = month_start + timedelta(days=(i // len(THICKNESSES)) % days)
+        thickness = THICKNESSES[i % len(THICKNESSES)]
+        rejection = round(rng.uniform(0.2, 6.0) + thickness * 0.4, 2)
+        row = [
+            day.strftime(date_style if rng.random() < 0.95 else '%m/%d/%Y'),
+            f'{thickness} mm' if rng.random() < 0.5 else thickness,
+            str(rejection).replace('.', ',') if rng.random() < 0.1 else rejection,
+        ]
+        if rng.random() < 0.005:
+            row[1] = 'n/a'
+        row += [round(rng.uniform(0, 100), 1) for _ in range(len(header) - 3)]
+        rows.append(row)
+    return rows
+
+
+def filler_rows(n_rows=200, n_cols=20, seed=0):
+    """An unrelated sheet, for workbooks with many sheets."""
+    rng = random.Random(seed)
+    return [[round(rng.uniform(0, 1000), 2) for _ in range(n_cols)] for _ in range(n_rows)]
+
+
+def _ods_cell(value):
+    if value is None:
+        return '<table:table-cell/>'
+    if isinstance(value, datetime):
+        return (f'<table:table-cell office:value-type="date" office:date-value="{value.date().isoformat()}">'
+                f'<text:p>{value.strftime("%d/%m/%Y")}</text:p></table:table-cell>')
+    if isinstance(value, (int, float)):
+        return f'<table:table-cell office:value-type="float" office:value="{value!r}"><text:p>{value}</text:p></table:table-cell>'
+    return f'<table:table-cell office:value-type="string"><text:p>{escape(str(value))}</text:p></table:table-cell>'
+
+
+def _ods_table(name, rows):
+    parts = ['<table:table table:name="' + escape(name, {'"': '&quot;'}) + '">']
+    empty_run = 0
+    for row in rows:
+        if all(value is None for value in row):
+            empty_run += 1
+            continue
+        if empty_run:
+            parts.append(f'<table:table-row table:number-rows-repeated="{empty_run}"><table:table-cell/></table:table-row>')
+            empty_run = 0
+        parts.append('<table:table-row>')
+        parts.extend(_ods_cell(value) for value in row)
+        # LibreOffice pads every row out to the full sheet width
+        parts.append('<table:table-cell table:number-columns-repeated="1000"/></table:table-row>')
+    parts.append('<table:table-row table:number-rows-repeated="1048000"><table:table-cell table:number-columns-repeated="1024"/></table:table-row>')
+    parts.append('</table:table>')
+    return ''.join(parts)
+
+
+def write_ods(path, sheets):
+    """Write {sheet name: rows} as a minimal .ods package that ezodf and LibreOffice open."""
+    content = (f'<?xml version="1.0" encoding="UTF-8"?><office:document-content {ODS_NAMESPACES}>'
+               '<office:body><office:spreadsheet>'
+               + ''.join(_ods_table(name, rows) for name, rows in sheets.items())
+               + '</office:spreadsheet></office:body></office:document-content>')
+    styles = f'<?xml version="1.0" encoding="UTF-8"?><office:document-styles {ODS_NAMESPACES}/>'
+    meta = f'<?xml version="1.0" encoding="UTF-8"?><office:document-meta {ODS_NAMESPACES}><office:meta/></office:document-meta>'
+    manifest = ('<?xml version="1.0" encoding="UTF-8"?>'
+                '<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0">'
+                f'<manifest:file-entry manifest:full-path="/" manifest:media-type="{ODS_MIMETYPE}"/>'
+                '<manifest:file-entry manifest:full-path="content.xml" manifest:media-type="text/xml"/>'
+                '<manifest:file-entry manifest:full-path="styles.xml" manifest:media-type="text/xml"/>'
+                '<manifest:file-entry manifest:full-path="meta.xml" manifest:media-type="text/xml"/>'
+                '</manifest:manifest>')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        # The mimetype must come first and stay uncompressed
+        archive.writestr(zipfile.ZipInfo('mimetype'), ODS_MIMETYPE, compress_type=zipfile.ZIP_STORED)
+        archive.writestr('META-INF/manifest.xml', manifest)
+        archive.writestr('styles.xml', styles)
+        archive.writestr('meta.xml', meta)
+        archive.writestr('content.xml', content)
+
+
+def write_xlsx(path, sheets):
+    """Write {sheet name: rows} with openpyxl's streaming writer."""
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    for name, rows in sheets.items():
+        sheet = workbook.create_sheet(name)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+
+
+def build_sheets(size_rows=1000, size_cols=3, filler_sheets=0, month_start=date(2024, 3, 1), seed=0):
+    sheets = {}
+    for k in range(filler_sheets // 2):
+        sheets[f'Filler {k}'] = filler_rows(seed=seed + k)
+    sheets['Stamping Rej'] = stamping_rej_rows(month_start, seed)
+    sheets['Size wise Rej'] = size_wise_rows(size_rows, size_cols, month_start, seed)
+    for k in range(filler_sheets // 2, filler_sheets):
+        sheets[f'Filler {k}'] = filler_rows(seed=seed + k)
+    return sheets
+
+
+def write_workbook(path, **kwargs):
+    """Write a synthetic workbook; the format follows the file extension (.ods or .xlsx)."""
+    sheets = build_sheets(**kwargs)
+    if path.endswith('.xlsx'):
+        write_xlsx(path, sheets)
+    else:
+        write_ods(path, sheets)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write a synthetic rejection workbook')
+    parser.add_argument('path', help='output .ods or .xlsx file')
+    parser.add_argument('--rows', type=int, default=1000, help="data rows in 'Size wise Rej'")
+    parser.add_argument('--cols', type=int, default=3, help="columns in 'Size wise Rej'")
+    parser.add_argument('--filler-sheets', type=int, default=0, help='extra unrelated sheets')
+    parser.add_argument('--month', default='2024-03', help='YYYY-MM of the Stamping Rej dates')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    month_start = datetime.strptime(args.month, '%Y-%m').date()
+    write_workbook(args.path, size_rows=args.rows, size_cols=args.cols, filler_sheets=args.filler_sheets,
+                   month_start=month_start, seed=args.seed)
+    print(args.path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Column of the day × type matrix holding the sheets produced that day
+TOTAL = 'Total Sheets'
+
+
+def breakdown_frame(total_sheets, rejection_sheets, rejection_types):
+    """
+    The breakdown result every view shows: (df, total_sheets,
+    total_rejection_sheets, total_rejection_percentage), with df sorted by
+    rejection percentage.
+    """
+    rejection_sheets = np.asarray(rejection_sheets, dtype=np.float64)[:len(rejection_types)]
+    total_rejection_sheets = float(rejection_sheets.sum())
+    rejection_percentage = rejection_sheets / total_sheets * 100 if total_sheets else np.zeros_like(rejection_sheets)
+    df = pd.DataFrame({
+        'Rejection Type': pd.Categorical(rejection_types[:len(rejection_sheets)], categories=rejection_types),
+        'Rejection Sheets': rejection_sheets.astype(np.float32),
+        'Rejection Percentage': rejection_percentage.astype(np.float32),
+    }).sort_values('Rejection Percentage', ascending=False)
+    total_rejection_percentage = (total_rejection_sheets / total_sheets) * 100 if total_sheets else 0
+    return df, total_sheets, total_rejection_sheets, total_rejection_percentage
+
+
+class BreakdownIndex:
+    """
+    Prefix sums over a day × rejection-type matrix of sheet counts.
+
+    `daily` has a Date column, the Total Sheets of each day and one column per
+    rejection type; days of several months can simply be concatenated. Built
+    once in O(days × types), the totals of any date window then cost two
+    binary searches and one subtraction per type, whatever the window spans.
+    """
+
+    def __init__(self, daily):
+        daily = daily.sort_values('Date', kind='stable')
+        self.types = [column for column in daily.columns if column not in ('Date', TOTAL)]
+        self.dates = daily['Date'].to_numpy('datetime64[ns]')
+        counts = daily[[TOTAL] + self.types].to_numpy(np.float64)
+        self.prefix = np.zeros((len(daily) + 1, len(self.types) + 1))
+        np.cumsum(counts, axis=0, out=self.prefix[1:])
+
+    def __len__(self):
+        return len(self.dates)
+
+    def _bounds(self, start, end):
+        first = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start)), 'left'))
+        last = len(self.dates) if end is None else int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end)), 'right'))
+        return first, max(first, last)
+
+    def window_totals(self, start=None, end=None):
+        """(total sheets, sheets per type) of the days from start to end, both inclusive."""
+        first, last = self._bounds(start, end)
+        sums = self.prefix[last] - self.prefix[first]
+        return float(sums[0]), sums[1:]
+
+    def breakdown(self, start=None, end=None):
+        """breakdown_frame() of a date window."""
+        total_sheets, rejection_sheets = self.window_totals(start, end)
+        return breakdown_frame(total_sheets, rejection_sheets, self.types)
+
+    def top_n(self, n=5, start=None, end=None):
+        """The n rejection types with the highest percentage in a date window."""
+        return self.breakdown(start, end)[0].head(n)
+
+
+def select_window(index, result, key):
+    """
+    Date-range picker for a breakdown view. The full range keeps `result`
+    (the sheet's own totals row); a narrower window is answered from `index`.
+    """
+    if index is None or not len(index):
+        return result
+    first_day = pd.Timestamp(index.dates[0]).date()
+    last_day = pd.Timestamp(index.dates[-1]).date()
+    window = st.date_input('Breakdown window', value=(first_day, last_day),
+                           min_value=first_day, max_value=last_day, key=key)
+    if len(window) != 2 or (tuple(window) == (first_day, last_day) and result is not None):
+        return result
+    return index.breakdown(*window)
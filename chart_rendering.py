@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+import streamlit as st
+
+# Above this many points a trace is drawn with WebGL instead of SVG
+WEBGL_THRESHOLD = 2000
+# Most points sent to the browser per trace after downsampling
+MAX_POINTS = 1500
+
+
+def _as_float(values):
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype('int64').to_numpy(dtype=np.float64)
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: positions of n_out points that keep the
+    visual shape of the (x, y) series. x must be sorted; NaN y values are skipped.
+    """
+    x = _as_float(x)
+    y = _as_float(y)
+    positions = np.flatnonzero(~np.isnan(y))
+    n = len(positions)
+    if n_out >= n or n_out < 3:
+        return positions
+    x, y = x[positions], y[positions]
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    bucket = (n - 2) / (n_out - 2)
+    anchor = 0
+    for i in range(n_out - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        next_end = min(int((i + 2) * bucket) + 1, n)
+        # The next bucket's average is the third corner of the triangle
+        next_x = x[end:next_end].mean() if next_end > end else x[-1]
+        next_y = y[end:next_end].mean() if next_end > end else y[-1]
+        area = np.abs((x[anchor] - next_x) * (y[start:end] - y[anchor])
+                      - (x[anchor] - x[start:end]) * (next_y - y[anchor]))
+        anchor = start + int(np.argmax(area))
+        selected[i + 1] = anchor
+    return positions[selected]
+
+
+def downsample(df, x, y, max_points=MAX_POINTS):
+    """Rows of df (sorted by x) reduced to at most max_points with LTTB."""
+    if len(df) <= max_points:
+        return df
+    df = df.sort_values(x)
+    return df.iloc[lttb_indices(df[x], df[y], max_points)]
+
+
+def line_trace(x, y, name, mode='lines+markers', max_points=MAX_POINTS):
+    """A line trace that switches to WebGL and LTTB downsampling for long series."""
+    x = pd.Series(x).reset_index(drop=True)
+    y = pd.Series(y).reset_index(drop=True)
+    trace_type = go.Scattergl if len(x) > WEBGL_THRESHOLD else go.Scatter
+    if len(x) > max_points:
+        keep = lttb_indices(x, y, max_points)
+        x, y = x.iloc[keep], y.iloc[keep]
+        # Markers only add noise once the series has been thinned out
+        mode = 'lines'
+    return trace_type(x=x, y=y, mode=mode, name=name)
+
+
+def line_figure(df, x, y, max_points=MAX_POINTS, **px_kwargs):
+    """px.line with WebGL rendering and LTTB downsampling for long series."""
+    # plotly.express takes about half a second to import, so it loads with the first chart
+    import plotly.express as px
+    render_mode = 'webgl' if len(df) > WEBGL_THRESHOLD else 'svg'
+    return px.line(downsample(df, x, y, max_points), x=x, y=y, render_mode=render_mode, **px_kwargs)
+
+
+def downsample_groups(df, group, x, y, max_points=MAX_POINTS):
+    """Downsample each group separately, sharing the point budget between groups."""
+    if len(df) <= max_points:
+        return df
+    groups = df.groupby(group, sort=False, observed=True)
+    per_group = max(3, max_points // max(groups.ngroups, 1))
+    return pd.concat([downsample(part, x, y, per_group) for _, part in groups])
+
+
+def zoom_window(df, x, key, max_points=MAX_POINTS):
+    """
+    Date-window slider shown only for series too long to draw in full.
+    Downsampling runs on the selected window, so zooming in brings back detail.
+    """
+    if len(df) <= max_points:
+        return df
+    lowest, highest = df[x].min().to_pydatetime(), df[x].max().to_pydatetime()
+    start, end = st.slider('Zoom', min_value=lowest, max_value=highest, value=(lowest, highest),
+                           format='DD/MM/YYYY', key=key)
+    return df[(df[x] >= start) & (df[x] <= end)]
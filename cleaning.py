@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+import instrumentation
+from date_parsing import parse_date_column
+
+
+def extract_numbers(column, decimal_comma=False):
+    """
+    Vectorized numeric extraction: real numbers pass through, text keeps only
+    digits and dots ('2.5 mm' -> 2.5). Text that still isn't a number becomes NaN.
+    """
+    if pd.api.types.is_numeric_dtype(column):
+        return column.astype(np.float64)
+
+    values = pd.to_numeric(column, errors='coerce')
+    text = column[values.isna() & column.notna()].astype(str)
+    if decimal_comma:
+        text = text.str.replace(',', '.', regex=False)
+    text = text.str.replace(r'[^\d.]', '', regex=True)
+    values.loc[text.index] = pd.to_numeric(text, errors='coerce')
+    return values.astype(np.float64)
+
+
+def _is_blank(column):
+    return column.isna() | (column.astype(str).str.strip() == '')
+
+
+def clean_size_wise_rows(raw_data, column_map):
+    """
+    Turn raw 'Size wise Rej' rows into Date (datetime64), Thickness
+    (categorical) and Rejection Percentage (float32).
+
+    Every step works on whole columns. Returns (clean_df, rejected_df,
+    date_format_counts). rejected_df has one line per failed value with the
+    sheet row, column, raw value and reason; rows blank in all three columns
+    are dropped without being reported.
+    """
+    columns = {}
+    for role in ('date', 'thickness', 'rejection'):
+        name = column_map[role]
+        columns[role] = raw_data[name] if name in raw_data else pd.Series(None, index=raw_data.index, dtype=object)
+
+    with instrumentation.stage('date parsing'):
+        dates, date_format_counts = parse_date_column(columns['date'])
+    thickness = extract_numbers(columns['thickness'])
+    rejection = extract_numbers(columns['rejection'], decimal_comma=True)
+
+    blank = {role: _is_blank(column) for role, column in columns.items()}
+    empty_row = blank['date'] & blank['thickness'] & blank['rejection']
+
+    # A zero thickness is not a valid size, while a zero rejection is a real reading
+    checks = [
+        ('date', blank['date'], 'missing date'),
+        ('date', dates.isna() & ~blank['date'], 'unrecognised date format'),
+        ('thickness', blank['thickness'], 'missing thickness'),
+        ('thickness', thickness.isna() & ~blank['thickness'], 'no number found'),
+        ('thickness', thickness == 0, 'zero thickness'),
+        ('rejection', blank['rejection'], 'missing rejection percentage'),
+        ('rejection', rejection.isna() & ~blank['rejection'], 'no number found'),
+    ]
+
+    valid = pd.Series(True, index=raw_data.index)
+    report = []
+    for role, failed, reason in checks:
+        valid &= ~failed
+        failed = failed & ~empty_row
+        if failed.any():
+            report.append(pd.DataFrame({
+                'Sheet Row': failed.index[failed] + 2,  # header is sheet row 1
+                'Column': column_map[role],
+                'Value': columns[role][failed].astype(str).values,
+                'Reason': reason,
+            }))
+
+    # A handful of sizes repeat over every row, so Thickness is stored as a categorical
+    clean_df = pd.DataFrame({
+        'Date': dates[valid].to_numpy('datetime64[ns]'),
+        'Thickness': pd.Categorical(thickness[valid].to_numpy()),
+        'Rejection Percentage': rejection[valid].to_numpy(np.float32),
+    })
+
+    if report:
+        rejected_df = pd.concat(report, ignore_index=True).sort_values('Sheet Row', kind='stable').reset_index(drop=True)
+    else:
+        rejected_df = pd.DataFrame(columns=['Sheet Row', 'Column', 'Value', 'Reason'])
+
+    return clean_df, rejected_df, date_format_counts
@@ -0,0 +1,307 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from date_parsing import parse_date_column
+
+# Resolved mappings are remembered per header layout, so the LLM runs at most once per layout
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'column_mappings.json')
+ROLES = ('date', 'thickness', 'rejection')
+
+# Header words that identify each column, strongest first
+ROLE_KEYWORDS = {
+    'date': ('date', 'day', 'dt'),
+    'thickness': ('thickness', 'thick', 'thk', 'gauge', 'size', 'mm'),
+    'rejection': ('rejection', 'rej', 'percentage', 'percent', '%'),
+}
+
+# Rows inspected when checking a column's content
+SAMPLE_ROWS = 200
+MIN_SCORE = 1.8
+
+# The sheet summary sent to the LLM: a few distinct values per column, within a token budget
+SAMPLE_VALUES = 5
+MAX_VALUE_CHARS = 24
+TOKEN_BUDGET = 600
+MAPPING_MAX_TOKENS = 100
+MAPPING_PROMPT = """The JSON below summarises a spreadsheet: the number of rows and, per column, its header, inferred type and a few distinct values.
+
+{summary}
+
+Which columns hold the date, the sheet thickness in mm and the rejection percentage? Reply with only a JSON object using the exact header names: {{"date": "...", "thickness": "...", "rejection": "..."}}. Use null for a role that no column fits."""
+
+_cache_lock = threading.Lock()
+
+
+def _normalize(header):
+    return re.sub(r'\s+', ' ', str(header).strip().lower())
+
+
+def header_signature(headers):
+    """Stable key of a sheet layout: the normalized header names in order."""
+    joined = '\x1f'.join(_normalize(header) for header in headers)
+    return hashlib.sha1(joined.encode('utf-8')).hexdigest()
+
+
+def _keyword_score(header, role):
+    name = _normalize(header)
+    words = re.findall(r'[a-z]+|%', name)
+    for rank, keyword in enumerate(ROLE_KEYWORDS[role]):
+        if keyword in words:
+            return 3.0 - rank * 0.1
+        if keyword in name:
+            return 2.0 - rank * 0.1
+    return 0.0
+
+
+def _content_score(column, role):
+    """Share of sampled values that look like the role: dates, or numbers."""
+    sample = column.dropna().head(SAMPLE_ROWS)
+    if sample.empty:
+        return 0.0
+    if role == 'date':
+        dates, _ = parse_date_column(sample)
+        return float(dates.notna().mean())
+    if pd.api.types.is_numeric_dtype(sample):
+        return 1.0
+    return float(sample.astype(str).str.contains(r'\d').mean())
+
+
+def match_columns(raw_data, headers):
+    """
+    Resolve the date, thickness and rejection columns from header names and
+    column content, without any network call. Returns a mapping
+    {'date': ..., 'thickness': ..., 'rejection': ...} or None if a role is
+    ambiguous or missing.
+    """
+    candidates = []
+    for header in dict.fromkeys(headers):
+        if header not in raw_data:
+            continue
+        for role in ROLES:
+            keyword = _keyword_score(header, role)
+            # Numbers alone don't tell thickness from rejection, so those need a header hint
+            if not keyword and role != 'date':
+                continue
+            content = _content_score(raw_data[header], role)
+            if content == 0:
+                continue
+            candidates.append((keyword + 2 * content, role, header))
+
+    mapping = {}
+    for score, role, header in sorted(candidates, key=lambda c: c[0], reverse=True):
+        if score < MIN_SCORE or role in mapping or header in mapping.values():
+            continue
+        mapping[role] = header
+    return mapping if len(mapping) == len(ROLES) else None
+
+
+def estimate_tokens(text):
+    """Rough token count of a text (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def _column_type(sample):
+    if sample.empty:
+        return 'empty'
+    if pd.api.types.is_datetime64_any_dtype(sample):
+        return 'date'
+    if pd.api.types.is_numeric_dtype(sample):
+        return 'number'
+    if parse_date_column(sample)[0].notna().mean() >= 0.8:
+        return 'date'
+    if pd.to_numeric(sample, errors='coerce').notna().mean() >= 0.8:
+        return 'number'
+    return 'text'
+
+
+def _sample_value(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, float):
+        return float(f'{value:.6g}')
+    return str(value)[:MAX_VALUE_CHARS]
+
+
+def schema_summary(raw_data, headers, token_budget=TOKEN_BUDGET):
+    """
+    Compact JSON description of a sheet for the LLM: the row count and, per
+    column, the header, inferred type ('date', 'number', 'text' or 'empty')
+    and up to SAMPLE_VALUES distinct values. Samples are dropped until the
+    summary fits `token_budget`; headers are always kept.
+    """
+    columns = []
+    for header in dict.fromkeys(headers):
+        column = raw_data[header] if header in raw_data else pd.Series(dtype=object)
+        sample = column.dropna().head(SAMPLE_ROWS)
+        distinct = [_sample_value(value) for value in sample.drop_duplicates().head(SAMPLE_VALUES)]
+        columns.append((header, _column_type(sample), distinct))
+
+    for samples in range(SAMPLE_VALUES, -1, -1):
+        summary = json.dumps({
+            'rows': len(raw_data),
+            'columns': [{'header': header, 'type': kind, 'samples': distinct[:samples]}
+                        for header, kind, distinct in columns],
+        }, ensure_ascii=False, separators=(',', ':'))
+        if estimate_tokens(summary) <= token_budget:
+            break
+    return summary
+
+
+def mapping_request(raw_data, headers, token_budget=TOKEN_BUDGET):
+    """Prompt asking the LLM for the column mapping of a sheet as JSON."""
+    return MAPPING_PROMPT.format(summary=schema_summary(raw_data, headers, token_budget))
+
+
+def parse_mapping(answer, headers):
+    """
+    The mapping in a JSON answer to mapping_request(), or None unless it
+    names three distinct existing columns. Text around the object (such as
+    a code fence) is ignored.
+    """
+    start, end = answer.find('{'), answer.rfind('}')
+    if start < 0 or end < start:
+        return None
+    try:
+        reply = json.loads(answer[start:end + 1])
+    except ValueError:
+        return None
+    if not isinstance(reply, dict):
+        return None
+    mapping = {role: reply.get(role) for role in ROLES}
+    return mapping if is_valid_mapping(mapping, headers) else None
+
+
+def is_valid_mapping(mapping, headers):
+    """A mapping must name three distinct existing columns."""
+    return (mapping is not None and set(mapping) == set(ROLES)
+            and all(mapping[role] in headers for role in ROLES)
+            and len(set(mapping.values())) == len(ROLES))
+
+
+def _read_cache(path=CACHE_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(entries, path=CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def remember_mapping(headers, mapping, guidance=None, path=CACHE_PATH):
+    """Store a mapping for this header layout (also how manual fixes are saved)."""
+    with _cache_lock:
+        entries = _read_cache(path)
+        entries[header_signature(headers)] = {'mapping': mapping, 'guidance': guidance}
+        _write_cache(entries, path)
+
+
+def forget_mapping(headers, path=CACHE_PATH):
+    """Drop what is stored for this header layout, so the LLM may be asked again."""
+    with _cache_lock:
+        entries = _read_cache(path)
+        if entries.pop(header_signature(headers), None) is not None:
+            _write_cache(entries, path)
+
+
+def resolve_columns(raw_data, headers, llm_fallback=None, path=CACHE_PATH):
+    """
+    Find the date, thickness and rejection columns of a sheet.
+
+    A mapping stored on disk for the same header layout wins, then the local
+    matcher is tried. Only if both fail is `llm_fallback` (a callable returning
+    the LLM's answer to mapping_request()) called. Its answer is stored on
+    disk whether or not it holds a valid mapping, so the LLM is asked at most
+    once per layout; forget_mapping() allows another attempt. Errors raised
+    by `llm_fallback` (no API key, network) propagate and store nothing.
+
+    Returns (mapping or None, source, guidance) where source is one of
+    'cache', 'local', 'llm' or None.
+    """
+    with _cache_lock:
+        entry = _read_cache(path).get(header_signature(headers))
+    if entry and is_valid_mapping(entry['mapping'], headers):
+        return entry['mapping'], 'cache', entry.get('guidance')
+
+    mapping = match_columns(raw_data, headers)
+    if mapping is not None:
+        return mapping, 'local', None
+
+    if entry is not None:
+        # The LLM already failed on this layout
+        return None, None, entry.get('guidance')
+    if llm_fallback is None:
+        return None, None, None
+    guidance = llm_fallback()
+    mapping = parse_mapping(guidance, headers)
+    remember_mapping(headers, mapping, guidance, path)
+    if mapping is not None:
+        return mapping, 'llm', guidance
+    return None, None, guidance
+
+
+class _StubBlock:
+    def __init__(self, text):
+        self.type = 'text'
+        self.text = text
+
+
+class _StubUsage:
+    def __init__(self, input_tokens, output_tokens):
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+
+
+class _StubResponse:
+    def __init__(self, text, usage):
+        self.content = [_StubBlock(text)]
+        self.usage = usage
+
+
+class _StubMessages:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, **kwargs):
+        client = self._client
+        client.requests.append(kwargs)
+        text = client.reply(kwargs)
+        prompt = ''.join(message['content'] for message in kwargs.get('messages', []))
+        usage = _StubUsage(estimate_tokens(prompt), min(estimate_tokens(text), kwargs.get('max_tokens', float('inf'))))
+        client.usage.append(usage)
+        time.sleep(client.latency + usage.input_tokens * client.input_token_seconds
+                   + usage.output_tokens * client.output_token_seconds)
+        return _StubResponse(text, usage)
+
+
+class StubClient:
+    """
+    Offline stand-in for anthropic.Anthropic exposing messages.create().
+    `reply` is a fixed answer or a callable taking the request kwargs.
+    Requests are recorded in `requests` and their estimated token counts in
+    `usage` (also set on each response, as the SDK does). Each call sleeps
+    `latency` plus a per-token time, so payload size shows in benchmarks.
+    """
+
+    def __init__(self, reply='{"date": "Date", "thickness": "Thickness", "rejection": "Rejection %"}',
+                 latency=0.0, input_token_seconds=0.0, output_token_seconds=0.0):
+        self.reply = reply if callable(reply) else (lambda request: reply)
+        self.latency = latency
+        self.input_token_seconds = input_token_seconds
+        self.output_token_seconds = output_token_seconds
+        self.requests = []
+        self.usage = []
+        self.messages = _StubMessages(self)
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pandas as pd
+
+# Formats seen across the plant workbooks, in order of preference
+DATE_FORMATS = [
+    '%d-%m-%Y', '%m-%d-%Y', '%Y-%m-%d',  # Common formats
+    '%d/%m/%Y', '%m/%d/%Y', '%Y/%m/%d',  # Slash-separated
+    '%B %d, %Y', '%d %B %Y',  # Full month name
+    '%b %d, %Y', '%d %b %Y'   # Abbreviated month name
+]
+
+# Formats used for the B17:B47 dates of the 'Stamping Rej' sheet
+TREND_DATE_FORMATS = ['%d/%m/%Y', '%Y-%m-%d', '%m/%d/%Y']
+
+# Number of values used to pick the dominant format of a column
+SAMPLE_SIZE = 64
+
+
+def _dominant_format(sample, formats):
+    """Return the format that parses most of the sample; ties go to the earlier format."""
+    best_format, best_count = None, 0
+    for fmt in formats:
+        count = pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum()
+        if count > best_count:
+            best_format, best_count = fmt, count
+    return best_format
+
+
+def parse_date_column(values, formats=DATE_FORMATS):
+    """
+    Parse a whole column of dates in vectorized passes.
+
+    Values that are already datetimes are kept as they are. The remaining
+    values are stripped, the dominant format is inferred from a sample and
+    applied to the whole column at once, and the other formats are tried in
+    order only on the rows that are still unparsed.
+
+    Returns (dates, counts): a datetime64 Series aligned with `values` (NaT
+    where nothing matched) and the number of rows matched by each format,
+    with 'datetime' for native values, 'unparsed' for text that matched no
+    format and 'blank' for empty cells.
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series, {'datetime': int(series.notna().sum()), 'unparsed': 0, 'blank': int(series.isna().sum())}
+
+    dates = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+    counts = {}
+
+    native = series.map(lambda value: isinstance(value, datetime))
+    if native.any():
+        dates.loc[native] = pd.to_datetime(series[native])
+        counts['datetime'] = int(native.sum())
+
+    # Everything else is parsed as text; blanks never count as dates
+    text = series[~native & series.notna()].astype(str).str.strip()
+    text = text[text != '']
+
+    blank = len(series) - int(native.sum()) - len(text)
+
+    dominant = _dominant_format(text.head(SAMPLE_SIZE), formats) if not text.empty else None
+    if dominant is not None:
+        formats = [dominant] + [fmt for fmt in formats if fmt != dominant]
+    for fmt in formats:
+        if text.empty:
+            break
+        parsed = pd.to_datetime(text, format=fmt, errors='coerce')
+        matched = parsed.notna()
+        if matched.any():
+            dates.loc[parsed.index[matched]] = parsed[matched]
+            counts[fmt] = int(matched.sum())
+            text = text[~matched]
+
+    counts['unparsed'] = len(text)
+    counts['blank'] = blank
+    return dates, counts
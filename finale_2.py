@@ -1,70 +1,76 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objs as go
-import ezodf
+import workbook_cache
+import workbook_reader
+import workbook_watch
+import instrumentation
+import table_rendering
+import history_store
+import main_final
+import breakdown_index
 
-def load_rejection_data():
-    """Load rejection data from the OpenDocument Spreadsheet file."""
-    # Open the .ods file
-    doc = ezodf.opendoc('/home/galactose/Downloads/sahyadri_march.ods')
-    
-    # Select the 'Stamping Rej' sheet
-    sheet = None
-    for s in doc.sheets:
-        if s.name == 'Stamping Rej':
-            sheet = s
-            break
+def load_rejection_data(path=None):
+    """Load rejection data, reusing the parsed result while the file is unchanged."""
+    path = path or workbook_reader.data_path()
+    with instrumentation.stage('workbook cache'):
+        return workbook_cache.cached(path, 'Stamping Rej', 'breakdown', lambda: read_rejection_data(path))
+
+def read_rejection_data(path):
+    """Load rejection data from the .ods, .xlsx or .csv workbook."""
+    # Only the totals row of 'Stamping Rej' is read (row 50, columns C to X)
+    with instrumentation.stage('read ranges'):
+        cells = workbook_reader.read_ranges(path, 'Stamping Rej', {'totals': 'C50:X50'})
     
-    if not sheet:
+    if cells is None:
         st.error("Sheet 'Stamping Rej' not found in the document.")
         return None
     
-    # Total sheets produced (row 50, column C - remember 0-based indexing)
-    total_sheets = float(sheet[49, 2].value or 0)
-    
-    # Rejection columns and types
-    rejection_columns = [3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23]
-    rejection_types = [
-        'Layer Open', 'Water Mark', 'Extra Material', 'Bend', 'Edge Damage', 
-        'TWM', 'VC', 'TC', 'Cutting Mist', 'Side Damage', 
-        'Corner Damage', 'LT', 'FT', 'Surf Defect', 'Hole Damge', 
-        'Temp Damage', 'Rolling Particle', 'TV', 'GSD', 'Brittle', 
-        'Lab Sheet'
-    ]
-    # Calculate rejection percentages
-    rejection_data = []
-    total_rejection_sheets = 0
-    for col, rej_type in zip(rejection_columns, rejection_types):
-        rejection_sheets = float(sheet[49, col].value or 0)
-        total_rejection_sheets += rejection_sheets
-        rejection_percentage = (rejection_sheets / total_sheets) * 100
-        rejection_data.append({
-            'Rejection Type': rej_type,
-            'Rejection Sheets': rejection_sheets,
-            'Rejection Percentage': rejection_percentage
-        })6.10%
-    # Convert to DataFrame and sort
-    rejection_df = pd.DataFrame(rejection_data)
-    rejection_df = rejection_df.sort_values('Rejection Percentage', ascending=False)
-    
-    return rejection_df, total_sheets, total_rejection_sheets, total_rejection_percentage
+    # Rejection percentages per type, highest first, labelled with main_final.REJECTION_TYPES
+    return main_final.load_rejection_breakdown_data(cells)
+
+def load_daily_breakdown(path=None):
+    """Load the day × type matrix, reusing it while the sheet is unchanged."""
+    path = path or workbook_reader.data_path()
+    with instrumentation.stage('workbook cache'):
+        return workbook_cache.cached(path, 'Stamping Rej', 'daily', lambda: read_daily_breakdown(path))
 
+def read_daily_breakdown(path):
+    """Per-day counts of each rejection type (rows 17 to 47), or None if there are none."""
+    with instrumentation.stage('read ranges'):
+        cells = workbook_reader.read_ranges(path, 'Stamping Rej', {'dates': 'B17:B47', 'daily': 'C17:X47'})
+    if cells is None:
+        return None
+    return main_final.load_daily_breakdown(cells)
+
+@instrumentation.instrumented('finale_2')
 def main():
     st.title('Stamping Rejection Analysis')
     
-    # Load data
-    result = load_rejection_data()
+    # Load data, from the history store when a range of months is wanted
+    months = history_store.available_months('breakdown')
+    source = st.sidebar.radio('Data source', ['Workbook', 'History store']) if months else 'Workbook'
+    if source == 'History store':
+        start_month, end_month = st.sidebar.select_slider('Months', options=months, value=(months[0], months[-1]))
+        result = history_store.query_breakdown(start_month, end_month)
+        daily = history_store.query_daily_breakdown(start_month, end_month)
+    else:
+        result = load_rejection_data()
+        daily = load_daily_breakdown()
     if result is None:
         return
     
+    # Any range of days, across months too, is answered from prefix sums over the daily rows
+    index = breakdown_index.BreakdownIndex(daily) if daily is not None else None
+    result = breakdown_index.select_window(index, result, key='breakdown_window')
+    
     rejection_df, total_sheets, total_rejection_sheets, total_rejection_percentage = result
     
     # Top 5 Rejections
     st.header('Top 5 Rejection Types')
-    top_5_df = rejection_df.head()
+    # Plotly Express cannot group by a categorical with unused categories
+    top_5_df = rejection_df.head().astype({'Rejection Type': str})
     
     # Bar Chart using Plotly
+    import plotly.express as px
     fig = px.bar(
         top_5_df, 
         x='Rejection Type', 
@@ -94,7 +100,8 @@ def main():
     )
     
     # Display the chart
-    st.plotly_chart(fig)
+    with instrumentation.stage('plotly render'):
+        st.plotly_chart(fig)
     
     # Summary Statistics
     st.header('Rejection Summary')
@@ -108,10 +115,15 @@ def main():
     
     # Detailed Table
     st.header('Detailed Rejection Analysis')
-    st.dataframe(rejection_df[['Rejection Type', 'Rejection Sheets', 'Rejection Percentage']].style.format({
-        'Rejection Sheets': '{:.2f}',
-        'Rejection Percentage': '{:.2f}%'
-    }))
+    with instrumentation.stage('table render'):
+        table_rendering.render_table(rejection_df[['Rejection Type', 'Rejection Sheets', 'Rejection Percentage']], key='breakdown_table', column_config={
+            'Rejection Sheets': table_rendering.DECIMAL,
+            'Rejection Percentage': table_rendering.PERCENT
+        })
+    
+    # Follow edits to the workbook while the page is open
+    if source == 'Workbook':
+        workbook_watch.watch(workbook_reader.data_path(), ['Stamping Rej'], key='breakdown')
 
 if __name__ == '__main__':
     main()
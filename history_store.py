@@ -0,0 +1,197 @@
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+import cleaning
+import column_mapping
+import main_final
+import size_wise_rej
+import stats_cube
+
+# Parquet dataset with one partition per month: <root>/<table>/month=YYYY-MM/data.parquet
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'history')
+TABLES = ('trend', 'breakdown', 'daily_breakdown', 'size_wise', 'size_wise_cube')
+
+
+def _partition_path(table, month, root=HISTORY_PATH):
+    return os.path.join(root, table, f'month={month}', 'data.parquet')
+
+
+def _write_partition(df, table, month, root=HISTORY_PATH):
+    """Replace one month of a table atomically, so re-ingesting a month is idempotent."""
+    path = _partition_path(table, month, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return len(df)
+
+
+def _remove_partition(table, month, root=HISTORY_PATH):
+    """Drop one month of a table, if it was stored."""
+    path = _partition_path(table, month, root)
+    if os.path.exists(path):
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))
+
+
+def _storable(raw_df):
+    """Raw sheet columns can mix numbers and text; keep those as strings in Parquet."""
+    columns = {}
+    for name in raw_df.columns:
+        column = raw_df[name]
+        if column.dtype == object:
+            column = column.map(lambda value: None if value is None else str(value))
+        columns[str(name)] = column
+    return pd.DataFrame(columns)
+
+
+def _infer_month(trend_df):
+    """The month most of the trend dates fall in, as YYYY-MM."""
+    if trend_df is None or trend_df.empty:
+        return None
+    return trend_df['Date'].dt.strftime('%Y-%m').mode().iloc[0]
+
+
+def available_months(table, root=HISTORY_PATH):
+    """Sorted months that have a partition for the table."""
+    table_path = os.path.join(root, table)
+    if not os.path.isdir(table_path):
+        return []
+    return sorted(name.split('=', 1)[1] for name in os.listdir(table_path)
+                  if name.startswith('month=') and os.path.exists(os.path.join(table_path, name, 'data.parquet')))
+
+
+def ingest_workbook(path, month=None, root=HISTORY_PATH):
+    """
+    Extract the 'Stamping Rej' trend, breakdown and day × type breakdown, the raw 'Size wise Rej'
+    rows and their date × thickness stats cube of one monthly workbook into
+    the history store.
+    Re-ingesting a month replaces it: the month's partitions of tables the
+    workbook no longer yields are removed.
+    Returns (month, {table: rows written}).
+    """
+    stamping = main_final.load_stamping_rej(path)
+    if stamping is None:
+        raise ValueError(f"Sheet 'Stamping Rej' not found in {path}")
+    trend_df, breakdown_result, daily_df = stamping
+
+    month = month or _infer_month(trend_df)
+    if month is None:
+        raise ValueError(f"Could not infer the month of {path}; pass it explicitly")
+
+    written = {}
+    if trend_df is not None:
+        written['trend'] = _write_partition(trend_df, 'trend', month, root)
+
+    rejection_df, total_sheets, _, _ = breakdown_result
+    breakdown_df = rejection_df.assign(**{'Total Sheets': total_sheets})
+    written['breakdown'] = _write_partition(breakdown_df, 'breakdown', month, root)
+    if daily_df is not None:
+        written['daily_breakdown'] = _write_partition(daily_df, 'daily_breakdown', month, root)
+
+    size_wise = size_wise_rej.read_raw_sheet_data(path)
+    if size_wise is not None:
+        raw_df, headers = size_wise
+        written['size_wise'] = _write_partition(_storable(raw_df), 'size_wise', month, root)
+        # The cube needs the columns matched; ingestion never calls the LLM
+        column_map, _, _ = column_mapping.resolve_columns(raw_df, headers)
+        if column_map:
+            processed_df, _, _ = cleaning.clean_size_wise_rows(raw_df, column_map)
+            written['size_wise_cube'] = _write_partition(stats_cube.build_cube(processed_df), 'size_wise_cube', month, root)
+
+    for table in TABLES:
+        if table not in written:
+            _remove_partition(table, month, root)
+    return month, written
+
+
+def _read_months(table, start_month, end_month, columns=None, root=HISTORY_PATH):
+    """Concatenate the partitions of a table between two months (inclusive)."""
+    frames = []
+    for month in available_months(table, root):
+        if (start_month is None or month >= start_month) and (end_month is None or month <= end_month):
+            frame = pd.read_parquet(_partition_path(table, month, root), columns=columns)
+            frames.append(frame.assign(Month=month))
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True)
+
+
+def query_trend(start_date=None, end_date=None, root=HISTORY_PATH):
+    """Daily rejection % between two dates, reading only the overlapping months."""
+    start = pd.Timestamp(start_date) if start_date is not None else None
+    end = pd.Timestamp(end_date) if end_date is not None else None
+    df = _read_months('trend', start.strftime('%Y-%m') if start is not None else None,
+                      end.strftime('%Y-%m') if end is not None else None, root=root)
+    if df is None:
+        return None
+    if start is not None:
+        df = df[df['Date'] >= start]
+    if end is not None:
+        df = df[df['Date'] <= end]
+    return df.drop(columns='Month').sort_values(by='Date').reset_index(drop=True)
+
+
+def query_breakdown(start_month=None, end_month=None, root=HISTORY_PATH):
+    """
+    Rejection breakdown summed over a range of months, in the same shape as
+    the workbook loaders: (df, total_sheets, total_rejection_sheets, total_rejection_percentage).
+    """
+    df = _read_months('breakdown', start_month, end_month, root=root)
+    if df is None:
+        return None
+    total_sheets = float(df.groupby('Month')['Total Sheets'].first().sum())
+    rejection_df = df.groupby('Rejection Type', sort=False, observed=True, as_index=False)['Rejection Sheets'].sum()
+    rejection_df['Rejection Percentage'] = (rejection_df['Rejection Sheets'] / total_sheets) * 100 if total_sheets else 0
+    rejection_df = rejection_df.sort_values('Rejection Percentage', ascending=False)
+    total_rejection_sheets = float(rejection_df['Rejection Sheets'].sum())
+    total_rejection_percentage = (total_rejection_sheets / total_sheets) * 100 if total_sheets else 0
+    return rejection_df, total_sheets, total_rejection_sheets, total_rejection_percentage
+
+
+def query_daily_breakdown(start_month=None, end_month=None, root=HISTORY_PATH):
+    """Day × type breakdown rows of a range of months (see breakdown_index), or None."""
+    df = _read_months('daily_breakdown', start_month, end_month, root=root)
+    if df is None:
+        return None
+    return df.drop(columns='Month')
+
+
+def query_size_wise(start_month=None, end_month=None, root=HISTORY_PATH):
+    """Raw 'Size wise Rej' rows of a range of months, with a Month column."""
+    return _read_months('size_wise', start_month, end_month, root=root)
+
+
+def query_size_wise_cube(start_month=None, end_month=None, root=HISTORY_PATH):
+    """The stats cubes of a range of months merged into one (see stats_cube)."""
+    df = _read_months('size_wise_cube', start_month, end_month, root=root)
+    if df is None:
+        return None
+    return stats_cube.merge_cubes([df.drop(columns='Month')])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rejection history store')
+    parser.add_argument('--root', default=HISTORY_PATH, help='history store directory')
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = commands.add_parser('ingest', help='add or replace the months of one or more workbooks')
+    ingest.add_argument('paths', nargs='+')
+    ingest.add_argument('--month', help='YYYY-MM, inferred from the trend dates by default')
+    commands.add_parser('months', help='list the months in the store')
+    args = parser.parse_args(argv)
+
+    if args.command == 'ingest':
+        for path in args.paths:
+            month, written = ingest_workbook(path, args.month, args.root)
+            print(f"{path}: {month} " + ", ".join(f"{table}={rows}" for table, rows in written.items()))
+    else:
+        for table in TABLES:
+            print(f"{table}: {', '.join(available_months(table, args.root)) or '-'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# One JSON line per script run, for offline aggregation
+LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'timings.jsonl')
+
+# Streamlit runs every session's script in its own thread
+_local = threading.local()
+_log_lock = threading.Lock()
+# Seconds each app's first import took, until its next run reports them
+_cold_starts = {}
+
+
+class Run:
+    """Timings of one script run: (stage path, seconds) in the order stages finished."""
+
+    def __init__(self, app):
+        self.app = app
+        self.started = time.perf_counter()
+        self.stages = []
+        self.stack = []
+        self.total = None
+        self.cold_start = _cold_starts.pop(app, None)
+
+    def as_record(self):
+        return {
+            'timestamp': datetime.now().isoformat(timespec='milliseconds'),
+            'app': self.app,
+            'total': self.total,
+            'cold_start': self.cold_start,
+            'stages': [{'stage': name, 'seconds': seconds} for name, seconds in self.stages],
+        }
+
+
+def current_run():
+    return getattr(_local, 'run', None)
+
+
+@contextmanager
+def cold_start(app):
+    """
+    Wrap the import of a page's module (named like its app). The first time
+    the import runs in this process it is timed and reported with the app's
+    next run as its cold start; later reruns find the module loaded.
+    """
+    if app in sys.modules:
+        yield
+        return
+    start = time.perf_counter()
+    yield
+    _cold_starts[app] = time.perf_counter() - start
+
+
+@contextmanager
+def stage(name):
+    """Time a block under the current run; nested stages are recorded as 'outer › inner'."""
+    run = current_run()
+    if run is None:
+        yield
+        return
+    run.stack.append(name)
+    path = ' › '.join(run.stack)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.stages.append((path, time.perf_counter() - start))
+        run.stack.pop()
+
+
+def _append_log(record, path=None):
+    # LOG_PATH is looked up per call so a harness can redirect the log
+    path = path or LOG_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _log_lock, open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+def render_timing_panel(run):
+    """Collapsible sidebar table of the stage timings of a run."""
+    import streamlit as st
+    with st.sidebar.expander(f'⏱️ Timings ({run.total * 1000:.0f} ms)'):
+        if run.cold_start is not None:
+            st.caption(f'Cold start: {run.cold_start * 1000:.0f} ms of imports before this run')
+        rows = [{'Stage': name, 'ms': round(seconds * 1000, 1)} for name, seconds in run.stages]
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+
+
+def _finish(run, render):
+    run.total = time.perf_counter() - run.started
+    _local.run = None
+    _append_log(run.as_record())
+    if render:
+        render_timing_panel(run)
+
+
+def instrumented(app, render=True):
+    """
+    Decorate a Streamlit main(): times the whole run and its stages, shows the
+    timing panel in the sidebar and appends the run to the JSONL log.
+    With render=False the run is only logged (e.g. outside a script run).
+    Called during another instrumented run (a fragment drawn by its page),
+    the call is timed as a stage of that run instead.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current_run() is not None:
+                with stage(app):
+                    return func(*args, **kwargs)
+            run = Run(app)
+            _local.run = run
+            completed = False
+            try:
+                result = func(*args, **kwargs)
+                completed = True
+                return result
+            finally:
+                # Reruns and stops raised by Streamlit leave nothing to render into
+                if current_run() is run:
+                    _finish(run, render=render and completed)
+        return wrapper
+    return decorator
+
+
+def summarize(path=None):
+    """Aggregate the log into count / mean / p95 seconds per (app, stage), cold starts included."""
+    import pandas as pd
+    path = path or LOG_PATH
+    rows = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            rows.append({'app': record['app'], 'stage': 'total', 'seconds': record['total']})
+            if record.get('cold_start') is not None:
+                rows.append({'app': record['app'], 'stage': 'cold start', 'seconds': record['cold_start']})
+            rows.extend({'app': record['app'], **s} for s in record['stages'])
+    df = pd.DataFrame(rows)
+    return df.groupby(['app', 'stage'])['seconds'].describe(percentiles=[0.5, 0.95])[['count', 'mean', '50%', '95%']]
+
+
+if __name__ == '__main__':
+    import pandas as pd
+    with pd.option_context('display.width', 200, 'display.max_rows', None, 'display.max_columns', None):
+        print(summarize())
@@ -1,103 +1,154 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import ezodf
-from datetime import datetime
+import workbook_cache
+import workbook_reader
+import instrumentation
+import chart_rendering
+import table_rendering
+import spc
+import breakdown_index
+from date_parsing import parse_date_column, TREND_DATE_FORMATS
 
-def parse_date(date_str):
-    """Attempts to parse a date from multiple formats."""
-    date_formats = ['%d/%m/%Y', '%Y-%m-%d', '%m/%d/%Y']
-    for fmt in date_formats:
-        try:
-            return datetime.strptime(date_str.strip(), fmt)
-        except ValueError:
-            continue
-    return None  # If all formats fail
+# The only cells of 'Stamping Rej' the trend and breakdown views use
+STAMPING_RANGES = {
+    'dates': 'B17:B47',
+    'rejection': 'Z17:Z47',
+    'daily': 'C17:X47',  # Each day's total sheets and rejection types, laid out like the totals row
+    'totals': 'C50:X50',  # Total sheets in C, the rejection types in D to X
+}
+REJECTION_TYPES = [
+    'Layer Open', 'Water Mark', 'Extra Material', 'Bend', 'Edge Damage', 
+    'TWM', 'VC', 'TC', 'Cutting Mist', 'Side Damage', 
+    'Corner Damage', 'LT', 'FT', 'Surf Defect', 'Hole Damage', 
+    'Temp Damage', 'Rolling Particle', 'TV', 'GSD', 'Brittle', 
+    'Lab Sheet'
+]
 
-def load_rejection_trend_data(sheet):
-    """Extracts rejection percentage trend data."""
-    rejection_trend_data = []
-    for row in range(16, 47):  # Rows B17 to B47
-        date_str = str(sheet[row, 1].value).strip() if sheet[row, 1].value else None
-        rejection_value = sheet[row, 25].value  # Column Z (index 25)
-        
-        if not date_str:
-            continue
-        
-        date = parse_date(date_str)
-        if not date:
-            continue
-        
-        try:
-            rejection_percentage = float(rejection_value) if rejection_value not in ["#DIV/0!", None] else None
-        except ValueError:
-            continue
-        
-        rejection_trend_data.append({'Date': date, 'Rejection %': rejection_percentage})
+def row_totals(values):
+    """Totals row as a float64 array, with empty cells counted as 0."""
+    return pd.to_numeric(pd.Series(values, dtype=object)).fillna(0).to_numpy(np.float64)
+
+def load_rejection_trend_data(cells):
+    """Extracts rejection percentage trend data from the STAMPING_RANGES cells."""
+    with instrumentation.stage('date parsing'):
+        dates, _ = parse_date_column(pd.Series(cells['dates']), TREND_DATE_FORMATS)
+    
+    # '#DIV/0!' and empty cells are kept as missing values, any other text drops the row
+    values = pd.Series(cells['rejection'], dtype=object)
+    rejection_percentage = pd.to_numeric(values, errors='coerce')
+    invalid = rejection_percentage.isna() & values.notna() & (values != "#DIV/0!")
+    keep = dates.notna() & ~invalid
     
-    if not rejection_trend_data:
+    if not keep.any():
         return None
     
-    df = pd.DataFrame(rejection_trend_data).sort_values(by='Date')
+    df = pd.DataFrame({'Date': dates[keep], 'Rejection %': rejection_percentage[keep].astype(np.float32)}).sort_values(by='Date')
     return df
 
-def load_rejection_breakdown_data(sheet):
-    """Extracts rejection breakdown by type."""
-    total_sheets = float(sheet[49, 2].value or 0)
-    rejection_columns = range(3, 24)  # Columns C to W
-    rejection_types = [
-        'Layer Open', 'Water Mark', 'Extra Material', 'Bend', 'Edge Damage', 
-        'TWM', 'VC', 'TC', 'Cutting Mist', 'Side Damage', 
-        'Corner Damage', 'LT', 'FT', 'Surf Defect', 'Hole Damage', 
-        'Temp Damage', 'Rolling Particle', 'TV', 'GSD', 'Brittle', 
-        'Lab Sheet'
-    ]
-    rejection_data = []
-    total_rejection_sheets = 0
-    for col, rej_type in zip(rejection_columns, rejection_types):
-        rejection_sheets = float(sheet[49, col].value or 0)
-        total_rejection_sheets += rejection_sheets
-        rejection_percentage = (rejection_sheets / total_sheets) * 100 if total_sheets else 0
-        rejection_data.append({'Rejection Type': rej_type, 'Rejection Sheets': rejection_sheets, 'Rejection Percentage': rejection_percentage})
-    df = pd.DataFrame(rejection_data).sort_values('Rejection Percentage', ascending=False)
-    total_rejection_percentage = (total_rejection_sheets / total_sheets) * 100 if total_sheets else 0
-    return df, total_sheets, total_rejection_sheets, total_rejection_percentage
+def load_rejection_breakdown_data(cells):
+    """Extracts rejection breakdown by type from the STAMPING_RANGES cells."""
+    totals = row_totals(cells['totals'])
+    return breakdown_index.breakdown_frame(float(totals[0]), totals[1:], REJECTION_TYPES)
+
+def load_daily_breakdown(cells):
+    """
+    Day × type matrix from the STAMPING_RANGES cells: Date, Total Sheets and
+    the sheets of each rejection type per day (empty cells count as 0).
+    Days without a date are left out. Returns None if no day has one.
+    """
+    with instrumentation.stage('date parsing'):
+        dates, _ = parse_date_column(pd.Series(cells['dates']), TREND_DATE_FORMATS)
+    keep = dates.notna().to_numpy()
+    if not keep.any():
+        return None
+    counts = pd.DataFrame(cells['daily'][keep], columns=[breakdown_index.TOTAL] + REJECTION_TYPES)
+    daily = counts.apply(pd.to_numeric, errors='coerce').fillna(0).astype(np.float32)
+    daily.insert(0, 'Date', dates[keep].to_numpy())
+    return daily
 
+def load_stamping_rej(path):
+    """
+    Open the workbook (a path or a binary file object) and run the trend,
+    breakdown and daily breakdown extractions on 'Stamping Rej'.
+    """
+    # Only the projected ranges are read; parsing stops after row 50
+    with instrumentation.stage('read ranges'):
+        cells = workbook_reader.read_ranges(path, 'Stamping Rej', STAMPING_RANGES)
+    if cells is None:
+        return None
+    with instrumentation.stage('trend extraction'):
+        trend = load_rejection_trend_data(cells)
+    with instrumentation.stage('breakdown extraction'):
+        breakdown = load_rejection_breakdown_data(cells)
+        daily = load_daily_breakdown(cells)
+    return trend, breakdown, daily
+
+def trend_figure(rejection_trend_df, control_df=None):
+    """Line chart of the daily rejection percentage, with control limits when control_df (see spc) is given."""
+    fig = chart_rendering.line_figure(rejection_trend_df, 'Date', 'Rejection %',
+                                      title='Rejection Percentage Trend', labels={'Rejection %': 'Rejection Percentage (%)'})
+    if control_df is not None:
+        spc.add_control_limits(fig, control_df, 'Date', 'Rejection %')
+    return fig
+
+def breakdown_figure(rejection_df, total_rejection_percentage):
+    """Bar chart of the top 5 rejection types."""
+    import plotly.express as px
+    # Plotly Express cannot group by a categorical with unused categories
+    top_5_df = rejection_df.head().astype({'Rejection Type': str})
+    return px.bar(top_5_df, x='Rejection Type', y='Rejection Percentage',
+                  title=f'Top 5 Rejection Types (Total Rejection: {total_rejection_percentage:.2f}%)',
+                  labels={'Rejection Percentage': 'Rejection Percentage (%)'}, color='Rejection Type')
+
+@instrumentation.instrumented('main_final')
 def main():
     st.title('📊 Stamping Rejection Analysis')
-    uploaded_file = st.file_uploader("📂 Upload an ODS file", type=['ods'])
+    uploaded_file = st.file_uploader("📂 Upload a workbook", type=list(workbook_reader.FORMATS))
     if not uploaded_file:
         st.warning("⚠️ Please upload a file to proceed.")
         return
     
-    with open("temp.ods", "wb") as f:
-        f.write(uploaded_file.read())
-    
-    doc = ezodf.opendoc("temp.ods")
-    sheet = next((s for s in doc.sheets if s.name == 'Stamping Rej'), None)
-    if not sheet:
+    # Each session keeps the parse of its own upload, so reruns never re-read it
+    upload_hash = workbook_cache.content_hash(uploaded_file)
+    parsed_upload = st.session_state.get('parsed_upload')
+    if parsed_upload and parsed_upload[0] == upload_hash:
+        result = parsed_upload[1]
+    else:
+        # The upload is an in-memory buffer the readers open directly;
+        # the same workbook uploaded in another session is only parsed once
+        with instrumentation.stage('workbook cache'):
+            result = workbook_cache.cached(uploaded_file, 'Stamping Rej', 'trend+breakdown+daily',
+                                           lambda: load_stamping_rej(uploaded_file))
+        st.session_state['parsed_upload'] = (upload_hash, result)
+    if not result:
         st.error("❌ Sheet 'Stamping Rej' not found!")
         return
     
-    rejection_trend_df = load_rejection_trend_data(sheet)
-    rejection_breakdown_result = load_rejection_breakdown_data(sheet)
+    rejection_trend_df, rejection_breakdown_result, daily_breakdown = result
     
     if rejection_trend_df is not None:
         st.header('📈 Rejection Percentage Trend Over Time')
-        fig = px.line(rejection_trend_df, x='Date', y='Rejection %',
-                      title='Rejection Percentage Trend', labels={'Rejection %': 'Rejection Percentage (%)'})
-        st.plotly_chart(fig)
-        st.dataframe(rejection_trend_df.style.format({'Date': lambda x: x.strftime('%d/%m/%Y'), 'Rejection %': '{:.2f}%'}))
+        visible_df = chart_rendering.zoom_window(rejection_trend_df, 'Date', key='trend_zoom')
+        with instrumentation.stage('spc'):
+            control_df = spc.control_points(rejection_trend_df, 'Date', 'Rejection %', key='upload_spc')
+        with instrumentation.stage('plotly render'):
+            st.plotly_chart(trend_figure(visible_df, control_df[control_df['Date'].between(
+                visible_df['Date'].min(), visible_df['Date'].max())]))
+        spc.render_alarms(control_df, 'Date', 'Rejection %')
+        with instrumentation.stage('table render'):
+            table_rendering.render_table(rejection_trend_df, key='upload_trend_table',
+                                         column_config={'Date': table_rendering.DATE, 'Rejection %': table_rendering.PERCENT})
     
     if rejection_breakdown_result:
+        st.header('🔍 Rejection Breakdown by Type')
+        # Any range of days is answered from prefix sums over the daily rows
+        index = breakdown_index.BreakdownIndex(daily_breakdown) if daily_breakdown is not None else None
+        rejection_breakdown_result = breakdown_index.select_window(index, rejection_breakdown_result, key='upload_window')
         rejection_df, total_sheets, total_rejection_sheets, total_rejection_percentage = rejection_breakdown_result
         
-        st.header('🔍 Rejection Breakdown by Type')
-        top_5_df = rejection_df.head()
-        fig = px.bar(top_5_df, x='Rejection Type', y='Rejection Percentage',
-                     title=f'Top 5 Rejection Types (Total Rejection: {total_rejection_percentage:.2f}%)',
-                     labels={'Rejection Percentage': 'Rejection Percentage (%)'}, color='Rejection Type')
-        st.plotly_chart(fig)
+        with instrumentation.stage('plotly render'):
+            st.plotly_chart(breakdown_figure(rejection_df, total_rejection_percentage))
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -108,7 +159,9 @@ def main():
             st.metric("Total Rejection Percentage", f"{total_rejection_percentage:.2f}%")
         
         st.header('📋 Detailed Rejection Data')
-        st.dataframe(rejection_df.style.format({'Rejection Sheets': '{:.2f}', 'Rejection Percentage': '{:.2f}%'}))
+        with instrumentation.stage('table render'):
+            table_rendering.render_table(rejection_df, key='upload_breakdown_table', column_config={
+                'Rejection Sheets': table_rendering.DECIMAL, 'Rejection Percentage': table_rendering.PERCENT})
 
 if __name__ == '__main__':
     main()
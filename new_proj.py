@@ -1,81 +1,117 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import ezodf
-from datetime import datetime
-
-def parse_date(date_str):
-    """Attempts to parse a date from multiple formats."""
-    date_formats = ['%d/%m/%Y', '%Y-%m-%d', '%m/%d/%Y']
-    for fmt in date_formats:
-        try:
-            return datetime.strptime(date_str.strip(), fmt)
-        except ValueError:
-            continue
-    return None  # If all formats fail
-
-def load_rejection_data():
-    """Load rejection data from the OpenDocument Spreadsheet file."""
-    doc = ezodf.opendoc('/home/galactose/Downloads/sahyadri_march.ods')
-
-    # Select the 'Stamping Rej' sheet
-    sheet = next((s for s in doc.sheets if s.name == 'Stamping Rej'), None)
-    if not sheet:
+import workbook_cache
+import workbook_reader
+import workbook_watch
+import instrumentation
+import chart_rendering
+import table_rendering
+import spc
+import history_store
+from date_parsing import parse_date_column, TREND_DATE_FORMATS
+
+def load_rejection_data(path=None):
+    """Load rejection data, reusing the parsed result while the file is unchanged."""
+    path = path or workbook_reader.data_path()
+    with instrumentation.stage('workbook cache'):
+        return workbook_cache.cached(path, 'Stamping Rej', 'trend', lambda: read_rejection_data(path))
+
+def read_rejection_data(path):
+    """
+    Load rejection data from the .ods, .xlsx or .csv workbook.
+    Returns (rejection_trend_df, skipped_df) where skipped_df lists the
+    sheet rows left out and why, or None if the sheet is missing.
+    """
+    # Read only the dates (B17:B47) and the rejection % (Z17:Z47) of 'Stamping Rej'
+    with instrumentation.stage('read ranges'):
+        cells = workbook_reader.read_ranges(path, 'Stamping Rej', {'dates': 'B17:B47', 'rejection': 'Z17:Z47'})
+    if cells is None:
         st.error("❌ Sheet 'Stamping Rej' not found!")
         return None
-    
-    # Collect data
-    rejection_trend_data = []
-    
-    for row in range(16, 47):  # Python index: B17 (row 16) to B47 (row 46)
-        date_str = str(sheet[row, 1].value).strip() if sheet[row, 1].value else None
-        rejection_value = sheet[row, 25].value  # Z column (column index 25)
-
-        # Handle missing date
-        if not date_str:
-            st.warning(f"⚠️ Skipping row {row + 1}: No date value.")
-            continue
-
-        # Parse date
-        date = parse_date(date_str)
-        if not date:
-            st.error(f"❌ Invalid date format in row {row + 1}: '{date_str}'")
-            continue
-
-        # Handle invalid rejection values
-        try:
-            rejection_percentage = float(rejection_value) if rejection_value not in ["#DIV/0!", None] else None
-        except ValueError:
-            st.warning(f"⚠️ Skipping row {row + 1}: Invalid rejection value '{rejection_value}'")
-            continue
-
-        # Add to data list
-        rejection_trend_data.append({'Date': date, 'Rejection %': rejection_percentage})
-
-    if not rejection_trend_data:
-        st.error("❌ No valid data found.")
-        return None
+    raw_dates = pd.Series(cells['dates'])
+    raw_values = pd.Series(cells['rejection'], dtype=object)
+
+    # Parse all dates in one pass
+    with instrumentation.stage('date parsing'):
+        dates, _ = parse_date_column(raw_dates, TREND_DATE_FORMATS)
+    date_text = raw_dates.astype(str).str.strip()
+    missing_date = raw_dates.isna() | (date_text == '')
+
+    # '#DIV/0!' and empty cells become missing values, any other text is invalid
+    rejection_percentage = pd.to_numeric(raw_values, errors='coerce')
+    invalid_value = rejection_percentage.isna() & raw_values.notna() & (raw_values != "#DIV/0!")
+
+    # The first reason that applies to a row: no date, then an unparsed date, then a bad value.
+    # The report is cached with the data, so every session shows it, not only the one that parsed
+    reason = pd.Series(None, index=raw_dates.index, dtype=object)
+    reason[invalid_value] = "Invalid rejection value '" + raw_values[invalid_value].astype(str) + "'"
+    reason[dates.isna()] = "Invalid date format '" + date_text[dates.isna()] + "'"
+    reason[missing_date] = 'No date value'
+    skipped_df = pd.DataFrame({'Sheet Row': raw_dates.index + 17, 'Reason': reason}).dropna()
+
+    keep = dates.notna() & ~missing_date & ~invalid_value
 
     # Convert to DataFrame and sort by date
-    rejection_trend_df = pd.DataFrame(rejection_trend_data).sort_values(by='Date')
-    return rejection_trend_df
+    rejection_trend_df = pd.DataFrame({
+        'Date': dates[keep],
+        'Rejection %': rejection_percentage[keep].astype(np.float32),
+    }).sort_values(by='Date')
+    return rejection_trend_df, skipped_df
+
+def render_skipped_rows(skipped_df):
+    """Collapsible list of the trend rows that were left out."""
+    if skipped_df is None or skipped_df.empty:
+        return
+    with st.expander(f"⚠️ {len(skipped_df)} rows skipped"):
+        table_rendering.render_table(skipped_df, key='skipped_trend_rows', hide_index=True)
 
+@instrumentation.instrumented('new_proj')
 def main():
     st.title('📊 Stamping Rejection Trend Analysis')
 
-    rejection_trend_df = load_rejection_data()
+    # Months already ingested can be queried without opening any workbook
+    months = history_store.available_months('trend')
+    source = st.sidebar.radio('Data source', ['Workbook', 'History store']) if months else 'Workbook'
+
+    if source == 'History store':
+        first_day = pd.Period(months[0]).start_time.date()
+        last_day = pd.Period(months[-1]).end_time.date()
+        date_range = st.sidebar.date_input('Date range', value=(first_day, last_day),
+                                           min_value=first_day, max_value=last_day)
+        if len(date_range) != 2:
+            st.info("Select the end of the date range.")
+            return
+        rejection_trend_df = history_store.query_trend(*date_range)
+    else:
+        loaded = load_rejection_data()
+        if loaded is None:
+            return
+        rejection_trend_df, skipped_df = loaded
+        render_skipped_rows(skipped_df)
+        if rejection_trend_df.empty:
+            st.error("❌ No valid data found.")
+            return
     if rejection_trend_df is None or rejection_trend_df.empty:
         return
 
     # Line Chart of Rejection % over Time
-    fig = px.line(
-        rejection_trend_df, 
-        x='Date', 
-        y='Rejection %',
+    # Long histories are drawn with WebGL and downsampled to the zoomed window
+    visible_df = chart_rendering.zoom_window(rejection_trend_df, 'Date', key='trend_zoom')
+    fig = chart_rendering.line_figure(
+        visible_df, 
+        'Date', 
+        'Rejection %',
         title='📈 Rejection Percentage Trend Over Time',
         labels={'Rejection %': 'Rejection Percentage (%)', 'Date': 'Date'}
     )
 
+    # Control limits and run-rule alarms; only days added since the last run are evaluated
+    with instrumentation.stage('spc'):
+        control_df = spc.control_points(rejection_trend_df, 'Date', 'Rejection %', key='trend_spc')
+    spc.add_control_limits(fig, control_df[control_df['Date'].between(visible_df['Date'].min(), visible_df['Date'].max())],
+                           'Date', 'Rejection %')
+
     fig.update_layout(
         xaxis_title='Date',
         yaxis_title='Rejection Percentage (%)',
@@ -83,14 +119,21 @@ def main():
         width=800
     )
 
-    st.plotly_chart(fig)
+    with instrumentation.stage('plotly render'):
+        st.plotly_chart(fig)
+    spc.render_alarms(control_df, 'Date', 'Rejection %')
 
     # Show Data
     st.header('📋 Rejection Trend Data')
-    st.dataframe(rejection_trend_df.style.format({
-        'Date': lambda x: x.strftime('%d/%m/%Y'),
-        'Rejection %': lambda x: f'{x:.2f}%' if x is not None else '-'
-    }))
+    with instrumentation.stage('table render'):
+        table_rendering.render_table(rejection_trend_df, key='trend_table', column_config={
+            'Date': table_rendering.DATE,
+            'Rejection %': table_rendering.PERCENT,
+        })
+
+    # Follow edits to the workbook while the page is open
+    if source == 'Workbook':
+        workbook_watch.watch(workbook_reader.data_path(), ['Stamping Rej'], key='trend')
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,367 @@
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from itertools import chain, repeat
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+# OpenDocument namespaces used in content.xml
+TABLE_NS = '{urn:oasis:names:tc:opendocument:xmlns:table:1.0}'
+OFFICE_NS = '{urn:oasis:names:tc:opendocument:xmlns:office:1.0}'
+TEXT_NS = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+
+TABLE = TABLE_NS + 'table'
+ROW = TABLE_NS + 'table-row'
+CELLS = (TABLE_NS + 'table-cell', TABLE_NS + 'covered-table-cell')
+TABLE_NAME = TABLE_NS + 'name'
+ROWS_REPEATED = TABLE_NS + 'number-rows-repeated'
+COLS_REPEATED = TABLE_NS + 'number-columns-repeated'
+VALUE_TYPE = OFFICE_NS + 'value-type'
+PARAGRAPH = TEXT_NS + 'p'
+SPACE = TEXT_NS + 's'
+TAB = TEXT_NS + 'tab'
+LINE_BREAK = TEXT_NS + 'line-break'
+NUMERIC_TYPES = ('float', 'percentage', 'currency')
+# Bytes of content.xml read at a time
+CHUNK_SIZE = 1 << 20
+
+
+def _paragraph_text(node):
+    """Flatten a text:p element, expanding the whitespace elements ODF compresses."""
+    parts = [node.text or '']
+    for child in node:
+        if child.tag == SPACE:
+            parts.append(' ' * int(child.get(TEXT_NS + 'c', 1)))
+        elif child.tag == TAB:
+            parts.append('\t')
+        elif child.tag == LINE_BREAK:
+            parts.append('\n')
+        else:
+            parts.append(_paragraph_text(child))
+        parts.append(child.tail or '')
+    return ''.join(parts)
+
+
+def _cell_value(cell):
+    """Typed value of a table cell: float, datetime, bool, str or None when empty."""
+    value_type = cell.get(VALUE_TYPE)
+    if value_type in NUMERIC_TYPES:
+        return float(cell.get(OFFICE_NS + 'value'))
+    if value_type == 'date':
+        return datetime.fromisoformat(cell.get(OFFICE_NS + 'date-value'))
+    if value_type == 'boolean':
+        return cell.get(OFFICE_NS + 'boolean-value') == 'true'
+    if value_type == 'time':
+        return cell.get(OFFICE_NS + 'time-value')
+    # Only the cell's own paragraphs: an office:annotation (comment) holds text:p elements too
+    text = '\n'.join(_paragraph_text(p) for p in cell.findall(PARAGRAPH))
+    return text or None
+
+
+def _row_values(row):
+    """
+    Expand a table-row into a list of cell values.
+    Repeated non-empty cells are expanded, trailing empty cells are dropped.
+    """
+    values = []
+    pending_empty = 0
+    for cell in row:
+        if cell.tag not in CELLS:
+            continue
+        count = int(cell.get(COLS_REPEATED, 1))
+        value = _cell_value(cell)
+        if value is None:
+            pending_empty += count
+            continue
+        if pending_empty:
+            values.extend(repeat(None, pending_empty))
+            pending_empty = 0
+        values.extend(repeat(value, count))
+    return values
+
+
+def _typed_column(values):
+    """Convert one column of cell values to the narrowest matching array."""
+    kinds = set(map(type, values))
+    kinds.discard(type(None))
+    if not kinds:
+        return np.full(len(values), None, dtype=object)
+    if kinds == {float}:
+        return np.array(values, dtype=np.float64)
+    if kinds == {datetime}:
+        return pd.to_datetime(values).values
+    return np.array(values, dtype=object)
+
+
+
+class _ColumnBuffer:
+    """
+    One column under construction, stored in a preallocated typed array that
+    doubles when full: float64 for numbers, datetime64 for dates, and object
+    as soon as any other kind of value (text, booleans, mixed types) arrives.
+    Empty cells are NaN / NaT / None. A column that is still all empty only
+    counts its length.
+    """
+
+    EMPTY = {float: np.nan, datetime: np.datetime64('NaT'), object: None}
+    DTYPES = {float: np.float64, datetime: 'datetime64[us]', object: object}
+
+    def __init__(self, length=0):
+        self.kind = None
+        self.data = None
+        self.length = length
+
+    def _allocate(self, kind, size):
+        self.kind = kind
+        return np.full(size, self.EMPTY[kind], dtype=self.DTYPES[kind])
+
+    def _to_object(self):
+        # Dates come back as datetime objects, and empty cells as None again
+        data = self.data[:self.length]
+        values = data.astype(object)
+        values[pd.isna(data)] = None
+        self.data = self._allocate(object, len(self.data))
+        self.data[:self.length] = values
+
+    def _reserve(self, needed):
+        if needed > len(self.data):
+            grown = self._allocate(self.kind, max(needed, 2 * len(self.data)))
+            grown[:self.length] = self.data[:self.length]
+            self.data = grown
+
+    def extend(self, value, count=1):
+        end = self.length + count
+        if value is not None:
+            kind = float if type(value) is float else datetime if type(value) is datetime else object
+            if self.kind is None:
+                self.data = self._allocate(kind, max(end, 1024))
+            elif kind is not self.kind and self.kind is not object:
+                self._to_object()
+            self._reserve(end)
+            self.data[self.length:end] = value
+        elif self.kind is not None:
+            # The array is pre-filled with the empty value
+            self._reserve(end)
+        self.length = end
+
+    def array(self):
+        if self.kind is None:
+            return np.full(self.length, None, dtype=object)
+        if self.kind is datetime:
+            return self.data[:self.length].astype('datetime64[ns]')
+        return self.data[:self.length]
+
+def parse_range(reference):
+    """'B17:Z47' (or a single cell 'C50') as zero-based inclusive (first_row, first_col, last_row, last_col)."""
+    corners = []
+    for cell in reference.upper().split(':'):
+        match = re.fullmatch(r'([A-Z]+)(\d+)', cell.strip())
+        if not match:
+            raise ValueError(f'Invalid cell range: {reference!r}')
+        col = 0
+        for letter in match.group(1):
+            col = col * 26 + ord(letter) - ord('A') + 1
+        corners.append((int(match.group(2)) - 1, col - 1))
+    (first_row, first_col), (last_row, last_col) = corners[0], corners[-1]
+    return min(first_row, last_row), min(first_col, last_col), max(first_row, last_row), max(first_col, last_col)
+
+
+def _chunks_from_table(content, sheet_name):
+    """
+    Byte-scan content.xml for the start tag of the `sheet_name` table, so the
+    XML of the sheets before it is never parsed. Returns the chunks to feed a
+    parser (the root start tag, which declares the namespaces, then the file
+    from that table on), or None if the tag was not found.
+    """
+    marker = ('<table:table table:name="' + escape(sheet_name, {'"': '&quot;'}) + '"').encode('utf-8')
+    buffer = b''
+    root = None
+    for chunk in iter(lambda: content.read(CHUNK_SIZE), b''):
+        buffer += chunk
+        if root is None:
+            start = buffer.find(b'<office:document-content')
+            end = buffer.find(b'>', start) if start >= 0 else -1
+            if end < 0:
+                continue
+            root, buffer = buffer[:end + 1], buffer[end + 1:]
+        position = buffer.find(marker)
+        if position >= 0:
+            return chain([root, buffer[position:]], iter(lambda: content.read(CHUNK_SIZE), b''))
+        # Keep enough of the tail to find a tag split across chunks
+        buffer = buffer[-len(marker):]
+    return None
+
+
+def _content_chunks(archive, sheet_name):
+    """content.xml from the `sheet_name` table on, or the whole file when the byte scan misses."""
+    with archive.open('content.xml') as content:
+        chunks = _chunks_from_table(content, sheet_name)
+        if chunks is not None:
+            yield from chunks
+            return
+    with archive.open('content.xml') as content:
+        yield from iter(lambda: content.read(CHUNK_SIZE), b'')
+
+
+def _stream_rows(source, sheet_name):
+    """
+    Yield (values, repeat_count) for every row of one sheet in content.xml.
+    A single None is yielded when the sheet is found, so callers can tell an
+    empty sheet from a missing one. Sheets before it are skipped by a byte
+    scan (or parsed but never expanded if the scan misses), and parsing stops
+    at the end of the requested sheet.
+    """
+    with zipfile.ZipFile(source) as archive:
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        in_sheet = False
+        for chunk in _content_chunks(archive, sheet_name):
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                if elem.tag == TABLE:
+                    if event == 'start':
+                        in_sheet = elem.get(TABLE_NAME) == sheet_name
+                        if in_sheet:
+                            yield None
+                    elif in_sheet:
+                        return
+                elif elem.tag == ROW and event == 'end':
+                    if in_sheet:
+                        yield _row_values(elem), int(elem.get(ROWS_REPEATED, 1))
+                    elem.clear()
+
+
+def project_rows(rows, ranges):
+    """
+    Collect the cells of `ranges` ({name: 'B17:B47', ...}) from
+    (values, repeat_count) rows, stopping once the last requested row is read.
+
+    Returns {name: array}: a typed 1-D array (see _typed_column) for ranges
+    of a single row or column, a 2-D object array otherwise.
+    """
+    bounds = {name: parse_range(reference) for name, reference in ranges.items()}
+    last_row = max(bound[2] for bound in bounds.values())
+    grids = {name: [[None] * (right - left + 1) for _ in range(bottom - top + 1)]
+             for name, (top, left, bottom, right) in bounds.items()}
+
+    row_index = 0
+    for values, count in rows:
+        if values:
+            for name, (top, left, bottom, right) in bounds.items():
+                cells = values[left:right + 1]
+                for row in range(max(row_index, top), min(row_index + count - 1, bottom) + 1):
+                    grids[name][row - top][:len(cells)] = cells
+        row_index += count
+        if row_index > last_row:
+            break
+
+    arrays = {}
+    for name, grid in grids.items():
+        if len(grid[0]) == 1:
+            arrays[name] = _typed_column([row[0] for row in grid])
+        elif len(grid) == 1:
+            arrays[name] = _typed_column(grid[0])
+        else:
+            arrays[name] = np.array(grid, dtype=object)
+    return arrays
+
+
+def read_ranges(source, sheet_name, ranges):
+    """
+    Read only the cell ranges of one sheet, e.g. {'dates': 'B17:B47'}.
+    Sheets before it are skipped without expanding their rows and parsing
+    stops after the last requested row. Returns project_rows' arrays, or
+    None if the sheet is missing.
+    """
+    rows = _stream_rows(source, sheet_name)
+    if next(rows, False) is False:
+        return None
+    return project_rows(rows, ranges)
+
+
+def sheet_names(source):
+    """List the sheet names of an .ods file in document order."""
+    names = []
+    with zipfile.ZipFile(source) as archive, archive.open('content.xml') as content:
+        for event, elem in ET.iterparse(content, events=('start', 'end')):
+            if elem.tag == TABLE and event == 'start':
+                names.append(elem.get(TABLE_NAME))
+            elif elem.tag == ROW and event == 'end':
+                elem.clear()
+    return names
+
+
+def read_sheet(source, sheet_name, header_row=0):
+    """
+    Read a whole sheet of an .ods file in a single pass over content.xml.
+
+    `source` is a path or a binary file object. Cell values are collected
+    column by column and each column is converted to a typed array
+    (float64, datetime64 or object). Repeated rows and columns are expanded
+    only when they hold data, so the trailing filler LibreOffice writes does
+    not inflate the result.
+
+    Returns (header_values, frame) where header_values is the raw content of
+    `header_row` (None when header_row is None) and frame holds the rows that
+    follow it with positional column labels. Returns None if the sheet is missing.
+    """
+    rows = _stream_rows(source, sheet_name)
+    if next(rows, False) is False:
+        return None
+    return frame_from_rows(rows, header_row)
+
+
+def frame_from_rows(rows, header_row=0):
+    """
+    Build (header_values, frame) as read_sheet does from an iterable of
+    (values, repeat_count) rows with trailing empty cells already dropped.
+    Cells go straight into typed column buffers; other readers (XLSX, CSV)
+    feed their rows through here.
+    """
+    columns = []
+    nrows = 0
+    pending_empty = 0
+    header_values = None
+    row_index = 0
+
+    for values, count in rows:
+        if header_row is not None and row_index <= header_row:
+            # The header (and anything above it) never enters the typed columns
+            skip = min(count, header_row - row_index + 1)
+            row_index += skip
+            count -= skip
+            if row_index > header_row:
+                header_values = values
+            if not count:
+                continue
+        row_index += count
+
+        if not values:
+            # Empty rows are only materialised if data follows them
+            pending_empty += count
+            continue
+
+        if pending_empty:
+            for column in columns:
+                column.extend(None, pending_empty)
+            nrows += pending_empty
+            pending_empty = 0
+
+        while len(columns) < len(values):
+            columns.append(_ColumnBuffer(nrows))
+
+        for col, column in enumerate(columns):
+            column.extend(values[col] if col < len(values) else None, count)
+        nrows += count
+
+    if header_row is not None:
+        header_values = header_values or []
+        while len(columns) < len(header_values):
+            columns.append(_ColumnBuffer(nrows))
+        header_values = header_values + [None] * (len(columns) - len(header_values))
+
+    frame = pd.DataFrame({col: column.array() for col, column in enumerate(columns)},
+                         index=pd.RangeIndex(nrows))
+    return header_values, frame
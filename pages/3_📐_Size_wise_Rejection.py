@@ -0,0 +1,7 @@
+import instrumentation
+
+# The first load of the view after a server start is reported as its cold start
+with instrumentation.cold_start('size_wise_rej'):
+    import size_wise_rej
+
+size_wise_rej.main()
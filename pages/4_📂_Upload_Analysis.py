@@ -0,0 +1,7 @@
+import instrumentation
+
+# The first load of the view after a server start is reported as its cold start
+with instrumentation.cold_start('main_final'):
+    import main_final
+
+main_final.main()
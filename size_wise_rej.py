@@ -1,85 +1,80 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objs as go
-import ezodf
-from datetime import datetime
-import anthropic
-import re
+import workbook_reader
+import workbook_cache
+import column_mapping
+import chart_rendering
+import table_rendering
+import cleaning
+import stats_cube
+import workbook_watch
+import instrumentation
 
-def load_raw_sheet_data():
-    """
-    Load raw data from the OpenDocument Spreadsheet file.
-    Capture entire sheet content for AI preprocessing.
-    """
-    # Open the .ods file
-    doc = ezodf.opendoc('/home/galactose/Downloads/sahyadri_march.ods')
-    
-    # Select the 'Size wise Rej' sheet
-    sheet = None
-    for s in doc.sheets:
-        if s.name == 'Size wise Rej':
-            sheet = s
-            break
+VIEWS = ('Column Mapping', 'Data Processing', 'Data Visualization')
+# Session state key remembering whether Claude may be asked, while the checkbox is not shown
+USE_AI_KEY = 'size_wise_use_ai'
+
+def _llm_error_key(headers):
+    """Session state key of the last failed Claude request for a header layout, kept for this session only."""
+    return f'size_wise_llm_error_{column_mapping.header_signature(headers)}'
+
+def read_raw_sheet_data(path):
+    """Parse the 'Size wise Rej' sheet into (raw_data, headers), or None if it is missing."""
+    # Stream the 'Size wise Rej' sheet straight into typed columns
+    with instrumentation.stage('read sheet'):
+        sheet = workbook_reader.read_sheet(path, 'Size wise Rej', header_row=0)
     
-    if not sheet:
-        st.error("Sheet 'Size wise Rej' not found in the document.")
+    if sheet is None:
         return None
     
-    # Prepare raw data extraction
-    raw_data = []
-    headers = []
+    header_values, columns = sheet
     
     # Extract headers
-    for col in range(sheet.ncols()):
-        headers.append(str(sheet[0, col].value).strip() if sheet[0, col].value else f'Column_{col}')
+    headers = [str(value).strip() if value else f'Column_{col}' for col, value in enumerate(header_values)]
     
-    # Extract all rows with their raw values
-    for row in range(1, sheet.nrows()):
-        row_data = {}
-        for col, header in enumerate(headers):
-            cell_value = sheet[row, col].value
-            row_data[header] = str(cell_value).strip() if cell_value is not None else ''
-        raw_data.append(row_data)
+    # Label the columns; as with a dict per row, a repeated header keeps its last column
+    raw_data = pd.DataFrame({header: columns[col] for col, header in enumerate(headers)})
     
     return raw_data, headers
 
-def preprocess_data_with_ai(raw_data, headers):
+def load_raw_sheet_data(path=None):
     """
-    Use Claude to preprocess and clean the raw data
+    Load raw data from the OpenDocument Spreadsheet file.
+    Capture entire sheet content for AI preprocessing.
     """
-    # Convert raw data to a string representation
-    data_str = "Headers: " + ", ".join(headers) + "\n\n"
-    data_str += "\n".join([str(row) for row in raw_data[:50]])  # Limit to first 50 rows to avoid context limits
+    path = path or workbook_reader.data_path()
+    # Reuse the parsed sheet across reruns and sessions while the file is unchanged
+    with instrumentation.stage('workbook cache'):
+        raw_data = workbook_cache.cached(path, 'Size wise Rej', 'raw', lambda: read_raw_sheet_data(path))
     
-    # Prepare the client
-    client = anthropic.Anthropic()
+    if raw_data is None:
+        st.error("Sheet 'Size wise Rej' not found in the document.")
+        return None
     
-    # Prepare the prompt for data preprocessing
-    prompt = f"""I have an Excel sheet with potentially inconsistent data. Analyze the following data:
-
-{data_str}
-
-Please help me:
-1. Identify the correct columns for date, thickness, and rejection percentage
-2.plot a graph if you can
-3. Suggest a standardized approach to parse dates (what formats are present?)
-4. Provide a strategy to clean and convert date, thickness, and rejection percentage columns
-5. Handle any inconsistencies or missing values
-6. Recommend how to convert these to numerical/datetime values
+    return raw_data
 
-Respond with:
-- Plot a graph between rejection percentage and thickness
-- Exact column names for date, thickness, and rejection percentage
-- Proposed parsing strategy
-- Any special handling needed
-- Sample code or transformation steps"""
+def preprocess_data_with_ai(raw_data, headers, client=None):
+    """
+    Ask Claude which columns hold the date, thickness and rejection percentage.
+    Only a compact schema summary of the sheet is sent (see
+    column_mapping.schema_summary) and the JSON answer is returned as text.
+    Pass `client` (e.g. column_mapping.StubClient) to run without the network.
+    Errors such as a missing API key or a failed request are raised, so they
+    are never mistaken for (and saved as) the model's answer.
+    """
+    prompt = column_mapping.mapping_request(raw_data, headers)
+    
+    # Prepare the client; the anthropic SDK is only imported when the LLM is actually called
+    if client is None:
+        import anthropic
+        client = anthropic.Anthropic()
     
-    try:
-        # Send request to Claude
+    # Send request to Claude
+    with instrumentation.stage('anthropic'):
         response = client.messages.create(
             model="claude-3-opus-20240229",
-            max_tokens=1000,
+            max_tokens=column_mapping.MAPPING_MAX_TOKENS,
             messages=[
                 {
                     "role": "user",
@@ -87,83 +82,167 @@ Respond with:
                 }
             ]
         )
-        
-        # Return the analysis text
-        return response.content[0].text
-    except Exception as e:
-        return f"Error in LLM preprocessing analysis: {str(e)}"
+    
+    # Return the answer text
+    return response.content[0].text
 
-def process_data_with_ai_guidance(raw_data, ai_guidance):
+def process_data_with_ai_guidance(raw_data, column_map, source=None, report=True):
     """
-    Process the data based on AI-generated guidance
+    Process the data using the resolved date, thickness and rejection columns.
+    Returns (processed_df, cube) where cube holds the mergeable statistics of
+    the cleaned rows per date and thickness (see stats_cube). With `source`
+    (the workbook) both are computed once per workbook and column mapping.
+    With report=False the matched date formats and skipped rows are not shown.
     """
-    # Parse the AI guidance to extract key information
-    def extract_column_name(guidance, column_type):
-        # Use regex to find column names in the guidance
-        pattern = rf"{column_type}\s*column\s*[:]?\s*['\"](.*?)['\"]"
-        match = re.search(pattern, guidance, re.IGNORECASE)
-        return match.group(1) if match else None
-    
-    # Extract column names
-    date_column = extract_column_name(ai_guidance, 'date')
-    thickness_column = extract_column_name(ai_guidance, 'thickness')
-    rejection_column = extract_column_name(ai_guidance, 'rejection')
-    
     # If columns not found, fallback to manual mapping
-    if not all([date_column, thickness_column, rejection_column]):
+    if not column_map:
         st.warning("Automatic column detection failed. Manual mapping may be required.")
         return None
     
-    # Prepare processed data
-    processed_data = []
+    def build():
+        # Clean all rows column-wise; bad values are collected instead of warned one by one
+        processed_df, rejected_df, date_format_counts = cleaning.clean_size_wise_rows(raw_data, column_map)
+        with instrumentation.stage('stats cube'):
+            cube = stats_cube.build_cube(processed_df)
+        return processed_df, rejected_df, date_format_counts, cube
     
-    # Date parsing function
-    def parse_date(date_str):
-        # List of potential date formats to try
-        date_formats = [
-            '%d-%m-%Y', '%m-%d-%Y', '%Y-%m-%d',  # Common formats
-            '%d/%m/%Y', '%m/%d/%Y', '%Y/%m/%d',  # Slash-separated
-            '%B %d, %Y', '%d %B %Y',  # Full month name
-            '%b %d, %Y', '%d %b %Y'   # Abbreviated month name
-        ]
-        
-        # Try parsing with different formats
-        for fmt in date_formats:
-            try:
-                return datetime.strptime(date_str.strip(), fmt)
-            except (ValueError, TypeError):
-                continue
-        
-        # If no format works, return None
-        return None
+    with instrumentation.stage('cleaning'):
+        if source is None:
+            result = build()
+        else:
+            spec = ('cleaned',) + tuple(column_map[role] for role in column_mapping.ROLES)
+            result = workbook_cache.cached(source, 'Size wise Rej', spec, build)
+    processed_df, rejected_df, date_format_counts, cube = result
+    if not report:
+        return processed_df, cube
     
-    # Process each row
-    for row in raw_data:
-        try:
-            # Parse date
-            date = parse_date(row.get(date_column, ''))
-            
-            # Convert thickness to float
-            thickness = float(re.sub(r'[^\d.]', '', str(row.get(thickness_column, ''))))
-            
-            # Convert rejection percentage to float
-            rejection_str = str(row.get(rejection_column, '')).replace(',', '.')
-            rejection_percentage = float(re.sub(r'[^\d.]', '', rejection_str))
-            
-            # Only add row if all critical values are present
-            if date and thickness and rejection_percentage is not None:
-                processed_data.append({
-                    'Date': date,
-                    'Thickness': thickness,
-                    'Rejection Percentage': rejection_percentage
-                })
-        
-        except (ValueError, TypeError) as e:
-            # Log parsing errors
-            st.warning(f"Error processing row: {row}. Error: {e}")
+    st.caption("Date formats matched: " + ", ".join(f"{fmt}: {count}" for fmt, count in date_format_counts.items()))
+    if not rejected_df.empty:
+        with st.expander(f"⚠️ {rejected_df['Sheet Row'].nunique()} rows skipped"):
+            table_rendering.render_table(rejected_df, key='rejected_rows', hide_index=True)
+    
+    return processed_df, cube
+
+def scatter_3d_figure(processed_df):
+    """3D scatter of rejection percentage by date and thickness"""
+    import plotly.express as px
+    # Keep the shape of each thickness series while bounding the points sent to the browser;
+    # numeric thickness keeps the continuous color scale
+    fig_3d = px.scatter_3d(
+        chart_rendering.downsample_groups(processed_df, 'Thickness', 'Date', 'Rejection Percentage').astype({'Thickness': float}), 
+        x='Date', 
+        y='Thickness', 
+        z='Rejection Percentage',
+        color='Thickness',
+        title='Rejection Percentage by Date and Thickness',
+        labels={
+            'Date': 'Date', 
+            'Thickness': 'Thickness (mm)', 
+            'Rejection Percentage': 'Rejection Percentage (%)'
+        }
+    )
+    
+    # Customize 3D plot layout
+    fig_3d.update_layout(
+        scene=dict(
+            xaxis_title='Date',
+            yaxis_title='Thickness (mm)',
+            zaxis_title='Rejection Percentage (%)'
+        ),
+        height=600,
+        width=900
+    )
+    return fig_3d
+
+def thickness_trend_figure(cube):
+    """One line per thickness of the mean daily rejection percentage, from the stats cube"""
+    pivot_df = stats_cube.daily_means(cube)
+    
+    # Line plot
+    fig_line = go.Figure()
+    for column in pivot_df.columns:
+        fig_line.add_trace(chart_rendering.line_trace(pivot_df.index, pivot_df[column], f'Thickness {column} mm'))
+    
+    fig_line.update_layout(
+        title='Rejection Percentage Trends by Thickness',
+        xaxis_title='Date',
+        yaxis_title='Rejection Percentage (%)',
+        height=500,
+        width=800
+    )
+    return fig_line
+
+def render_column_mapping(column_map, source, ai_preprocessing_guidance, headers):
+    """The resolved columns, or selectors to map them by hand when they could not be resolved."""
+    if column_map:
+        st.caption({'cache': 'Saved mapping for this sheet layout', 'local': 'Matched from headers and content',
+                    'llm': 'Detected by Claude and saved for this sheet layout'}[source])
+        st.table(pd.DataFrame({'Role': list(column_map), 'Column': list(column_map.values())}))
+    else:
+        # Let the operator map the columns once; the choice is saved for this layout
+        manual_map = {role: st.selectbox(f"{role.capitalize()} column", headers, key=f'map_{role}')
+                      for role in column_mapping.ROLES}
+        if st.button("Save mapping") and column_mapping.is_valid_mapping(manual_map, headers):
+            column_mapping.remember_mapping(headers, manual_map)
+            st.rerun()
+        if ai_preprocessing_guidance and st.button("Ask Claude again"):
+            column_mapping.forget_mapping(headers)
+            st.session_state.pop(_llm_error_key(headers), None)
+            st.rerun()
+    if ai_preprocessing_guidance:
+        st.caption("Claude's answer")
+        st.code(ai_preprocessing_guidance, language='json')
+
+@st.fragment
+@instrumentation.instrumented('size_wise_rej processed table', render=False)
+def processed_table(processed_df):
+    """Paginated table of the cleaned rows; turning a page reruns only this table."""
+    with instrumentation.stage('table render'):
+        table_rendering.render_table(processed_df, key='processed_table', column_config={
+            'Date': table_rendering.DATE,
+            'Rejection Percentage': table_rendering.DECIMAL
+        })
+
+@st.fragment
+@instrumentation.instrumented('size_wise_rej statistics', render=False)
+def descriptive_statistics(cube):
+    """Statistics per thickness over a date window, answered from the cube without rescanning the rows."""
+    st.header('Descriptive Statistics')
+    thicknesses = sorted(cube['Thickness'].unique())
+    selected_thicknesses = st.multiselect('Thickness (mm)', thicknesses, default=thicknesses)
+    first_day, last_day = cube['Date'].min().date(), cube['Date'].max().date()
+    window = st.date_input('Date range', value=(first_day, last_day),
+                           min_value=first_day, max_value=last_day, key='stats_window')
+    start, end = (window[0], window[-1]) if window else (first_day, last_day)
+    thickness_stats = stats_cube.thickness_statistics(
+        stats_cube.filter_cube(cube, start, end, selected_thicknesses))
     
-    return pd.DataFrame(processed_data)
+    with instrumentation.stage('table render'):
+        table_rendering.render_table(thickness_stats, key='thickness_stats_table', column_config={
+            'Mean': table_rendering.DECIMAL,
+            'Min': table_rendering.DECIMAL,
+            'Max': table_rendering.DECIMAL,
+            'Standard Deviation': table_rendering.DECIMAL
+        })
 
+@st.fragment
+@instrumentation.instrumented('size_wise_rej charts', render=False)
+def visualization(processed_df, cube):
+    """3D scatter and per-thickness trends of the zoomed window; zooming redraws only these charts."""
+    visible_df = chart_rendering.zoom_window(processed_df, 'Date', key='size_wise_zoom')
+    
+    # 3D Scatter Plot
+    with instrumentation.stage('plotly render'):
+        st.plotly_chart(scatter_3d_figure(visible_df))
+    
+    # Line plot of rejection percentage over time
+    with instrumentation.stage('plotly render'):
+        fig_line = thickness_trend_figure(
+            stats_cube.filter_cube(cube, visible_df['Date'].min(), visible_df['Date'].max()))
+        
+        st.plotly_chart(fig_line)
+
+@instrumentation.instrumented('size_wise_rej')
 def main():
     st.title('AI-Powered Excel Data Processing and Analysis')
     
@@ -177,94 +256,46 @@ def main():
     # Unpack raw data
     raw_rows, headers = raw_data
     
-    # Create tabs for different views
-    tab1, tab2, tab3 = st.tabs(['AI Preprocessing Guidance', 'Data Processing', 'Data Visualization'])
-    
-    with tab1:
-        st.header('AI Data Preprocessing Analysis')
-        # Get AI guidance on data preprocessing
-        ai_preprocessing_guidance = preprocess_data_with_ai(raw_rows, headers)
-        st.write(ai_preprocessing_guidance)
+    # Only the selected view is computed and drawn (st.tabs would run all three on every rerun)
+    view = st.radio('View', VIEWS, horizontal=True, key='size_wise_view')
     
-    with tab2:
+    # Match columns locally; Claude is only asked when that fails, once per header layout
+    use_ai = st.session_state.get(USE_AI_KEY, True)
+    if view == 'Data Processing':
         st.header('Processed Data')
-        # Process data based on AI guidance
-        processed_df = process_data_with_ai_guidance(raw_rows, ai_preprocessing_guidance)
+    elif view == 'Column Mapping':
+        st.header('Column Mapping')
+        use_ai = st.session_state[USE_AI_KEY] = st.checkbox(
+            "Ask Claude when the columns can't be matched locally", value=use_ai)
+    # After a failed request Claude is not asked again in this session until the operator retries
+    llm_error_key = _llm_error_key(headers)
+    llm_fallback = (lambda: preprocess_data_with_ai(raw_rows, headers)) if use_ai and llm_error_key not in st.session_state else None
+    with instrumentation.stage('column mapping'):
+        try:
+            column_map, source, ai_preprocessing_guidance = column_mapping.resolve_columns(raw_rows, headers, llm_fallback)
+        except Exception as e:
+            st.session_state[llm_error_key] = f"Error in LLM preprocessing analysis: {str(e)}"
+            column_map, source, ai_preprocessing_guidance = None, None, None
+    ai_preprocessing_guidance = ai_preprocessing_guidance or st.session_state.get(llm_error_key)
+    
+    if view == 'Column Mapping':
+        render_column_mapping(column_map, source, ai_preprocessing_guidance, headers)
+    else:
+        # Cleaned once per workbook and mapping; other reruns read it from the workbook cache
+        processed = process_data_with_ai_guidance(raw_rows, column_map, source=workbook_reader.data_path(),
+                                                  report=view == 'Data Processing')
+        processed_df, cube = processed if processed else (None, None)
         
-        if processed_df is not None and not processed_df.empty:
-            st.dataframe(processed_df)
-            
-            # Descriptive Statistics
-            st.header('Descriptive Statistics')
-            thickness_stats = processed_df.groupby('Thickness')['Rejection Percentage'].agg([
-                ('Mean', 'mean'),
-                ('Min', 'min'),
-                ('Max', 'max'),
-                ('Standard Deviation', 'std')
-            ]).reset_index()
-            
-            st.dataframe(thickness_stats.style.format({
-                'Mean': '{:.2f}',
-                'Min': '{:.2f}',
-                'Max': '{:.2f}',
-                'Standard Deviation': '{:.2f}'
-            }))
+        if processed_df is None or processed_df.empty:
+            st.error("Could not process data. Please review the column mapping.")
+        elif view == 'Data Processing':
+            processed_table(processed_df)
+            descriptive_statistics(cube)
         else:
-            st.error("Could not process data. Please review AI guidance and manually map columns.")
+            visualization(processed_df, cube)
     
-    with tab3:
-        if processed_df is not None and not processed_df.empty:
-            # 3D Scatter Plot
-            fig_3d = px.scatter_3d(
-                processed_df, 
-                x='Date', 
-                y='Thickness', 
-                z='Rejection Percentage',
-                color='Thickness',
-                title='Rejection Percentage by Date and Thickness',
-                labels={
-                    'Date': 'Date', 
-                    'Thickness': 'Thickness (mm)', 
-                    'Rejection Percentage': 'Rejection Percentage (%)'
-                }
-            )
-            
-            # Customize 3D plot layout
-            fig_3d.update_layout(
-                scene=dict(
-                    xaxis_title='Date',
-                    yaxis_title='Thickness (mm)',
-                    zaxis_title='Rejection Percentage (%)'
-                ),
-                height=600,
-                width=900
-            )
-            
-            st.plotly_chart(fig_3d)
-            
-            # Line plot of rejection percentage over time
-            grouped_df = processed_df.groupby(['Date', 'Thickness'])['Rejection Percentage'].mean().reset_index()
-            pivot_df = grouped_df.pivot(index='Date', columns='Thickness', values='Rejection Percentage')
-            
-            # Line plot
-            fig_line = go.Figure()
-            for column in pivot_df.columns:
-                fig_line.add_trace(go.Scatter(
-                    x=pivot_df.index, 
-                    y=pivot_df[column],
-                    mode='lines+markers',
-                    name=f'Thickness {column} mm'
-                ))
-            
-            fig_line.update_layout(
-                title='Rejection Percentage Trends by Thickness',
-                xaxis_title='Date',
-                yaxis_title='Rejection Percentage (%)',
-                height=500,
-                width=800
-            )
-            
-            st.plotly_chart(fig_line)
+    # Follow edits to the workbook while the page is open
+    workbook_watch.watch(workbook_reader.data_path(), ['Size wise Rej'], key='size_wise')
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
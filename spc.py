@@ -0,0 +1,194 @@
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+import streamlit as st
+
+import chart_rendering
+
+# d2 for moving ranges of two consecutive points: sigma is estimated as MR-bar / d2
+D2 = 1.128
+# Points needed before limits are drawn and the run rules are checked
+MIN_POINTS = 8
+RULES = {
+    'beyond 3σ': 'One point beyond the control limits',
+    '2 of 3 beyond 2σ': 'Two of three consecutive points beyond 2σ on the same side',
+    '4 of 5 beyond 1σ': 'Four of five consecutive points beyond 1σ on the same side',
+    '8 on one side': 'Eight consecutive points on the same side of the center line',
+    '6 trending': 'Six consecutive points steadily increasing or decreasing',
+}
+
+
+class IndividualsChart:
+    """
+    Streaming individuals / moving-range (I-MR) control chart.
+
+    update() is O(1) per point: it keeps Welford's running mean and
+    variance, the running mean of the moving range and the few recent
+    points the run rules look at. Each point is judged against the limits
+    of the points before it, so adding a day never revisits the history.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.previous = None
+        self.moving_range_sum = 0.0
+        self.recent_z = deque(maxlen=5)
+        self.side = 0
+        self.side_run = 0
+        self.trend_run = 0
+        self.direction = 0
+
+    @property
+    def std(self):
+        """Sample standard deviation of the points so far."""
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else math.nan
+
+    @property
+    def moving_range_mean(self):
+        return self.moving_range_sum / (self.n - 1) if self.n > 1 else math.nan
+
+    @property
+    def sigma(self):
+        """Short-term sigma estimated from the average moving range."""
+        return self.moving_range_mean / D2
+
+    def limits(self):
+        """(center, lower, upper) control limits, NaN until MIN_POINTS points were seen."""
+        if self.n < MIN_POINTS:
+            return math.nan, math.nan, math.nan
+        spread = 3 * self.sigma
+        return self.mean, self.mean - spread, self.mean + spread
+
+    def _rules(self, value, center, sigma):
+        z = (value - center) / sigma if sigma > 0 else 0.0
+        self.recent_z.append(z)
+        side = 1 if value > center else -1 if value < center else 0
+        if side and side == self.side:
+            self.side_run += 1
+        else:
+            self.side_run = 1 if side else 0
+        self.side = side
+
+        violated = []
+        if abs(z) > 3:
+            violated.append('beyond 3σ')
+        last5 = list(self.recent_z)
+        last3 = last5[-3:]
+        for sign in (1, -1):
+            if len(last3) == 3 and sum(sign * v > 2 for v in last3) >= 2 and sign * z > 2:
+                violated.append('2 of 3 beyond 2σ')
+            if len(last5) == 5 and sum(sign * v > 1 for v in last5) >= 4 and sign * z > 1:
+                violated.append('4 of 5 beyond 1σ')
+        if self.side_run >= 8:
+            violated.append('8 on one side')
+        if self.trend_run >= 6:
+            violated.append('6 trending')
+        return violated
+
+    def update(self, value):
+        """
+        Add one point. Returns (center, lower, upper, moving range, violated rules)
+        for it; missing values are reported but leave the chart unchanged.
+        """
+        if value is None or math.isnan(value):
+            return math.nan, math.nan, math.nan, math.nan, []
+        center, lower, upper = self.limits()
+
+        moving_range = abs(value - self.previous) if self.previous is not None else math.nan
+        if self.previous is not None:
+            # Trend runs count points, so n steady steps make a run of n + 1
+            direction = 1 if value > self.previous else -1 if value < self.previous else 0
+            if direction and direction == self.direction:
+                self.trend_run += 1
+            else:
+                self.trend_run = 2 if direction else 0
+            self.direction = direction
+
+        violated = self._rules(value, center, self.sigma) if not math.isnan(center) else []
+
+        # Welford update of the mean and the sum of squared deviations
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+        if self.previous is not None:
+            self.moving_range_sum += moving_range
+        self.previous = value
+        return center, lower, upper, moving_range, violated
+
+
+def evaluate(df, x, y, chart=None):
+    """
+    Feed the rows of a series sorted by x through a chart (a new one by
+    default). Returns (points, chart): the rows with Center, LCL, UCL,
+    Moving Range, Rules and Out of Control columns, and the chart state to
+    continue from.
+    """
+    chart = chart or IndividualsChart()
+    results = [chart.update(value) for value in pd.to_numeric(df[y], errors='coerce').astype(float)]
+    points = df[[x, y]].reset_index(drop=True)
+    if results:
+        center, lower, upper, moving_range, rules = zip(*results)
+    else:
+        center = lower = upper = moving_range = rules = ()
+    points['Center'] = np.array(center, dtype=np.float64)
+    points['LCL'] = np.array(lower, dtype=np.float64)
+    points['UCL'] = np.array(upper, dtype=np.float64)
+    points['Moving Range'] = np.array(moving_range, dtype=np.float64)
+    points['Rules'] = [', '.join(violated) for violated in rules]
+    points['Out of Control'] = points['Rules'] != ''
+    return points, chart
+
+
+def control_points(df, x, y, key):
+    """
+    evaluate() for a Streamlit page, keeping the chart state in the session.
+    When the series only gained rows since the last run (a new day in the
+    workbook or a wider date range), only the new rows are fed to the chart.
+    """
+    state = st.session_state.get(key)
+    if state is not None:
+        points, chart = state
+        seen = len(points)
+        head = df[[x, y]].iloc[:seen].reset_index(drop=True)
+        if seen <= len(df) and head.equals(points[[x, y]]):
+            if seen == len(df):
+                return points
+            new_points, chart = evaluate(df.iloc[seen:], x, y, chart)
+            points = pd.concat([points, new_points], ignore_index=True)
+            st.session_state[key] = (points, chart)
+            return points
+    points, chart = evaluate(df, x, y)
+    st.session_state[key] = (points, chart)
+    return points
+
+
+def add_control_limits(fig, points, x, y):
+    """Overlay the center line, control limits and out-of-control points on a trend figure."""
+    for column, dash in (('UCL', 'dash'), ('Center', 'dot'), ('LCL', 'dash')):
+        trace = chart_rendering.line_trace(points[x], points[column], column, mode='lines')
+        trace.update(line=dict(color='gray', dash=dash, width=1, shape='hv'), hoverinfo='skip')
+        fig.add_trace(trace)
+    alarms = points[points['Out of Control']]
+    fig.add_trace(go.Scatter(
+        x=alarms[x], y=alarms[y], mode='markers', name='Out of control',
+        marker=dict(color='red', size=10, symbol='x'), text=alarms['Rules'],
+        hovertemplate='%{x}<br>%{y:.2f}<br>%{text}<extra></extra>',
+    ))
+    return fig
+
+
+def render_alarms(points, x, y):
+    """Collapsible list of the out-of-control points and the rules they broke."""
+    alarms = points.loc[points['Out of Control'], [x, y, 'Rules']]
+    if alarms.empty:
+        st.caption("✅ No out-of-control points")
+        return
+    with st.expander(f"🚨 {len(alarms)} out-of-control points"):
+        st.dataframe(alarms, hide_index=True)
+        st.caption(" · ".join(f"{rule}: {description}" for rule, description in RULES.items()))
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+# Statistics kept per cube cell; all of them merge exactly across cells, files and months
+STATS = ('count', 'sum', 'sumsq', 'min', 'max')
+DIMENSIONS = ('Date', 'Thickness')
+VALUE = 'Rejection Percentage'
+_MERGE = {'count': 'sum', 'sum': 'sum', 'sumsq': 'sum', 'min': 'min', 'max': 'max'}
+
+
+def build_cube(df, dimensions=DIMENSIONS, value=VALUE):
+    """
+    Aggregate the rows once into one cell per combination of `dimensions`
+    holding the count, sum, sum of squares, min and max of `value`.
+    """
+    dimensions = list(dimensions)
+    values = df[value].astype(np.float64)
+    frame = df[dimensions].assign(value=values, square=values * values)
+    grouped = frame.groupby(dimensions, observed=True, sort=True)
+    cube = grouped['value'].agg(['count', 'sum', 'min', 'max'])
+    cube['sumsq'] = grouped['square'].sum()
+    return cube[list(STATS)].reset_index()
+
+
+def merge_cubes(cubes, dimensions=DIMENSIONS):
+    """Combine cubes (e.g. one per month) into a single cube over the same dimensions."""
+    cubes = [cube for cube in cubes if cube is not None]
+    if not cubes:
+        return None
+    return pd.concat(cubes, ignore_index=True).groupby(list(dimensions), observed=True).agg(_MERGE).reset_index()
+
+
+def filter_cube(cube, start=None, end=None, thicknesses=None):
+    """Cells of a date window (inclusive) and/or a set of thicknesses."""
+    keep = pd.Series(True, index=cube.index)
+    if start is not None:
+        keep &= cube['Date'] >= pd.Timestamp(start)
+    if end is not None:
+        keep &= cube['Date'] <= pd.Timestamp(end)
+    if thicknesses is not None:
+        keep &= cube['Thickness'].isin(thicknesses)
+    return cube[keep]
+
+
+def rollup(cube, by):
+    """
+    Collapse the cube onto the `by` dimensions and finish the statistics:
+    Count, Mean, Min, Max and the sample Standard Deviation (NaN for one value).
+    """
+    totals = cube.groupby(list(by), observed=True).agg(_MERGE)
+    count = totals['count']
+    mean = totals['sum'] / count
+    variance = ((totals['sumsq'] - totals['sum'] * mean) / (count - 1)).where(count > 1)
+    return pd.DataFrame({
+        'Count': count,
+        'Mean': mean,
+        'Min': totals['min'],
+        'Max': totals['max'],
+        # Rounding can leave a tiny negative variance when all values are equal
+        'Standard Deviation': np.sqrt(variance.clip(lower=0)),
+    }).reset_index()
+
+
+def thickness_statistics(cube):
+    """Mean, min, max and standard deviation of the rejection percentage per thickness."""
+    return rollup(cube, ['Thickness'])[['Thickness', 'Mean', 'Min', 'Max', 'Standard Deviation']]
+
+
+def daily_means(cube):
+    """Date × thickness table of the mean rejection percentage."""
+    means = cube.assign(Mean=cube['sum'] / cube['count'])
+    return means.pivot(index='Date', columns='Thickness', values='Mean')
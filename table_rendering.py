@@ -0,0 +1,27 @@
+import math
+
+import streamlit as st
+
+# Rows sent to the browser at once; longer tables are paginated on the server
+PAGE_SIZE = 500
+
+# Native column formats: the browser formats the cells, no Python runs per cell
+DATE = st.column_config.DatetimeColumn(format='DD/MM/YYYY')
+DECIMAL = st.column_config.NumberColumn(format='%.2f')
+PERCENT = st.column_config.NumberColumn(format='%.2f%%')
+
+
+def render_table(df, key, column_config=None, page_size=PAGE_SIZE, **dataframe_kwargs):
+    """
+    st.dataframe with column_config formats instead of a Styler. Tables longer
+    than `page_size` get a page selector (widget key `{key}_page`) and only
+    the selected page is serialised and sent, so sorting in the browser
+    applies within that page.
+    """
+    if len(df) > page_size:
+        pages = math.ceil(len(df) / page_size)
+        page = st.number_input(f'Page (1–{pages})', min_value=1, max_value=pages, value=1, step=1, key=f'{key}_page')
+        start = (page - 1) * page_size
+        st.caption(f'Rows {start + 1:,}–{min(start + page_size, len(df)):,} of {len(df):,}')
+        df = df.iloc[start:start + page_size]
+    st.dataframe(df, column_config=column_config, **dataframe_kwargs)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import finale_2
+import main_final
+import workbook_cache
+from benchmarks.synthetic_workbook import stamping_rej_rows, write_ods
+from breakdown_index import TOTAL, BreakdownIndex, breakdown_frame
+
+TYPES = ['Burr', 'Crack', 'Dent']
+
+
+@pytest.fixture
+def daily():
+    rng = np.random.default_rng(2)
+    days = pd.date_range('2024-03-01', periods=31)
+    frame = pd.DataFrame({'Date': days, TOTAL: rng.integers(800, 1200, len(days)).astype(float)})
+    for name in TYPES:
+        frame[name] = rng.integers(0, 30, len(days)).astype(float)
+    # Shuffled rows: the index sorts them by date
+    return frame.sample(frac=1, random_state=3)
+
+
+def test_window_totals_match_a_direct_sum(daily):
+    index = BreakdownIndex(daily)
+    assert index.types == TYPES and len(index) == 31
+    for start, end in [('2024-03-01', '2024-03-31'), ('2024-03-05', '2024-03-11'), ('2024-03-20', '2024-03-20')]:
+        window = daily[(daily['Date'] >= start) & (daily['Date'] <= end)]
+        total, per_type = index.window_totals(start, end)
+        assert total == window[TOTAL].sum()
+        np.testing.assert_allclose(per_type, window[TYPES].sum().to_numpy())
+
+
+def test_open_and_empty_windows(daily):
+    index = BreakdownIndex(daily)
+    assert index.window_totals()[0] == daily[TOTAL].sum()
+    assert index.window_totals(start='2024-03-31')[0] == daily.loc[daily['Date'] == '2024-03-31', TOTAL].sum()
+    total, per_type = index.window_totals('2024-03-10', '2024-03-05')
+    assert total == 0 and not per_type.any()
+    assert index.window_totals('2024-04-01', '2024-04-30')[0] == 0
+
+
+def test_breakdown_and_top_n(daily):
+    index = BreakdownIndex(daily)
+    df, total_sheets, total_rejection_sheets, total_rejection_percentage = index.breakdown('2024-03-05', '2024-03-11')
+    window = daily[(daily['Date'] >= '2024-03-05') & (daily['Date'] <= '2024-03-11')]
+    assert total_sheets == window[TOTAL].sum()
+    assert total_rejection_sheets == window[TYPES].sum().sum()
+    assert total_rejection_percentage == pytest.approx(total_rejection_sheets / total_sheets * 100)
+    assert df['Rejection Percentage'].is_monotonic_decreasing
+    top = index.top_n(2, '2024-03-05', '2024-03-11')
+    assert list(top['Rejection Type']) == list(df['Rejection Type'][:2])
+
+
+def test_breakdown_frame_without_sheets():
+    df, total_sheets, total_rejection_sheets, total_rejection_percentage = breakdown_frame(0, [0, 0, 0], TYPES)
+    assert (total_sheets, total_rejection_sheets, total_rejection_percentage) == (0, 0, 0)
+    assert not df['Rejection Percentage'].any()
+
+
+def test_breakdown_page_matches_the_upload_analysis(tmp_path):
+    path = str(tmp_path / 'book.ods')
+    write_ods(path, {'Stamping Rej': stamping_rej_rows()})
+    workbook_cache.evict()
+    _, breakdown, _ = main_final.load_stamping_rej(path)
+    page = finale_2.load_rejection_data(path)
+    pd.testing.assert_frame_equal(page[0], breakdown[0])
+    assert page[1:] == breakdown[1:]
+    assert set(page[0].iloc[:, 0]) <= set(main_final.REJECTION_TYPES)
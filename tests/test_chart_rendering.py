@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+import chart_rendering
+
+
+def test_short_series_are_kept_whole():
+    assert list(chart_rendering.lttb_indices(range(5), [1, 2, 3, 4, 5], 10)) == [0, 1, 2, 3, 4]
+
+
+def test_lttb_keeps_the_ends_and_the_spike():
+    y = np.sin(np.linspace(0, 20, 5000))
+    y[2345] = 50
+    indices = chart_rendering.lttb_indices(np.arange(5000), y, 100)
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 4999
+    assert np.all(np.diff(indices) > 0)
+    assert 2345 in indices
+
+
+def test_lttb_skips_missing_values():
+    y = np.arange(1000, dtype=float)
+    y[::7] = np.nan
+    indices = chart_rendering.lttb_indices(np.arange(1000), y, 50)
+    assert not np.isnan(y[indices]).any()
+
+
+def test_downsample_handles_dates():
+    df = pd.DataFrame({
+        'Date': pd.date_range('2024-03-01', periods=3000, freq='h'),
+        'Rejection %': np.random.default_rng(0).random(3000),
+    })
+    sampled = chart_rendering.downsample(df, 'Date', 'Rejection %', max_points=300)
+    assert len(sampled) == 300
+    assert sampled['Date'].is_monotonic_increasing
+    assert len(chart_rendering.downsample(df.head(200), 'Date', 'Rejection %', max_points=300)) == 200
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from cleaning import clean_size_wise_rows, extract_numbers
+
+COLUMN_MAP = {'date': 'Day', 'thickness': 'Size', 'rejection': 'Rej %'}
+
+
+def test_extract_numbers():
+    values = extract_numbers(pd.Series(['2.5 mm', 3, '  1.5', 'abc', None]))
+    assert values.dtype == np.float64
+    assert values.iloc[:3].tolist() == [2.5, 3.0, 1.5]
+    assert values.iloc[3:].isna().all()
+
+
+def test_extract_numbers_decimal_comma():
+    assert extract_numbers(pd.Series(['1,5 %', '2.25']), decimal_comma=True).tolist() == [1.5, 2.25]
+    assert extract_numbers(pd.Series(['1,5 %']))[0] == 15.0
+
+
+def test_numeric_columns_pass_through():
+    values = extract_numbers(pd.Series([1, 2], dtype=np.int64))
+    assert values.dtype == np.float64 and values.tolist() == [1.0, 2.0]
+
+
+def test_clean_rows_and_rejection_report():
+    raw = pd.DataFrame({
+        'Day': [datetime(2024, 3, 1), '02/03/2024', 'someday', None, '04/03/2024', None, '05/03/2024'],
+        'Size': ['0.5 mm', 1.5, 2.5, 2.5, 0, None, 'thick'],
+        'Rej %': ['1,5', 2, 3, 4, 0, None, 1],
+    })
+    clean_df, rejected_df, counts = clean_size_wise_rows(raw, COLUMN_MAP)
+
+    assert clean_df['Date'].tolist() == [pd.Timestamp('2024-03-01'), pd.Timestamp('2024-03-02')]
+    assert clean_df['Thickness'].dtype == 'category'
+    assert clean_df['Thickness'].tolist() == [0.5, 1.5]
+    assert clean_df['Rejection Percentage'].dtype == np.float32
+    assert clean_df['Rejection Percentage'].tolist() == [1.5, 2.0]
+
+    # Sheet row 7 is blank in all three columns and is not reported
+    assert rejected_df.to_dict('records') == [
+        {'Sheet Row': 4, 'Column': 'Day', 'Value': 'someday', 'Reason': 'unrecognised date format'},
+        {'Sheet Row': 5, 'Column': 'Day', 'Value': 'None', 'Reason': 'missing date'},
+        {'Sheet Row': 6, 'Column': 'Size', 'Value': '0', 'Reason': 'zero thickness'},
+        {'Sheet Row': 8, 'Column': 'Size', 'Value': 'thick', 'Reason': 'no number found'},
+    ]
+    assert counts['datetime'] == 1 and counts['unparsed'] == 1 and counts['blank'] == 2
+
+
+def test_missing_column_rejects_every_row():
+    raw = pd.DataFrame({'Day': ['01/03/2024'], 'Size': [1.5]})
+    clean_df, rejected_df, _ = clean_size_wise_rows(raw, COLUMN_MAP)
+    assert clean_df.empty
+    assert rejected_df['Reason'].tolist() == ['missing rejection percentage']
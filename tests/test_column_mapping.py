@@ -0,0 +1,123 @@
+import json
+
+import pandas as pd
+import pytest
+
+import column_mapping
+import size_wise_rej
+
+LLM_REPLY = '{"date": "A", "thickness": "B", "rejection": "C"}'
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'column_mappings.json')
+
+
+def named_sheet():
+    """A sheet the local matcher resolves from its headers."""
+    raw_data = pd.DataFrame({
+        'Date': ['01/03/2024', '02/03/2024', '03/03/2024'],
+        'Thickness': [0.5, 1.5, 2.5],
+        'Rejection %': [0.4, 0.2, 0.7],
+    })
+    return raw_data, list(raw_data.columns)
+
+
+def unnamed_sheet():
+    """The same content under headers that give the local matcher nothing to go on."""
+    raw_data, _ = named_sheet()
+    raw_data.columns = ['A', 'B', 'C']
+    return raw_data, list(raw_data.columns)
+
+
+def resolve(raw_data, headers, client, cache_path):
+    fallback = lambda: size_wise_rej.preprocess_data_with_ai(raw_data, headers, client=client)
+    return column_mapping.resolve_columns(raw_data, headers, fallback, path=cache_path)
+
+
+def test_local_match_skips_the_llm(cache_path):
+    raw_data, headers = named_sheet()
+    client = column_mapping.StubClient()
+    mapping, source, guidance = resolve(raw_data, headers, client, cache_path)
+    assert mapping == {'date': 'Date', 'thickness': 'Thickness', 'rejection': 'Rejection %'}
+    assert (source, guidance) == ('local', None)
+    assert client.requests == []
+
+
+def test_cache_hit_skips_matching_and_the_llm(cache_path):
+    raw_data, headers = unnamed_sheet()
+    column_mapping.remember_mapping(headers, {'date': 'A', 'thickness': 'B', 'rejection': 'C'}, path=cache_path)
+    client = column_mapping.StubClient()
+    mapping, source, _ = resolve(raw_data, headers, client, cache_path)
+    assert mapping == {'date': 'A', 'thickness': 'B', 'rejection': 'C'}
+    assert source == 'cache'
+    assert client.requests == []
+
+
+def test_llm_mapping_is_saved_for_the_layout(cache_path):
+    raw_data, headers = unnamed_sheet()
+    client = column_mapping.StubClient(reply=LLM_REPLY)
+    mapping, source, guidance = resolve(raw_data, headers, client, cache_path)
+    assert mapping == {'date': 'A', 'thickness': 'B', 'rejection': 'C'}
+    assert (source, guidance) == ('llm', LLM_REPLY)
+    assert len(client.requests) == 1
+    assert client.requests[0]['max_tokens'] == column_mapping.MAPPING_MAX_TOKENS
+
+    assert resolve(raw_data, headers, client, cache_path)[:2] == (mapping, 'cache')
+    assert len(client.requests) == 1
+
+
+def test_invalid_json_is_asked_once(cache_path):
+    raw_data, headers = unnamed_sheet()
+    client = column_mapping.StubClient(reply='The date is in column A.')
+    assert resolve(raw_data, headers, client, cache_path) == (None, None, 'The date is in column A.')
+    assert resolve(raw_data, headers, client, cache_path) == (None, None, 'The date is in column A.')
+    assert len(client.requests) == 1
+
+    column_mapping.forget_mapping(headers, path=cache_path)
+    resolve(raw_data, headers, client, cache_path)
+    assert len(client.requests) == 2
+
+
+def test_mapping_to_unknown_columns_is_rejected(cache_path):
+    raw_data, headers = unnamed_sheet()
+    client = column_mapping.StubClient(reply='{"date": "A", "thickness": "Gauge", "rejection": "C"}')
+    mapping, source, _ = resolve(raw_data, headers, client, cache_path)
+    assert (mapping, source) == (None, None)
+    resolve(raw_data, headers, client, cache_path)
+    assert len(client.requests) == 1
+
+
+def test_llm_errors_are_not_saved(cache_path):
+    raw_data, headers = unnamed_sheet()
+    client = column_mapping.StubClient(reply=lambda request: 1 / 0)
+    for _ in range(2):
+        with pytest.raises(ZeroDivisionError):
+            resolve(raw_data, headers, client, cache_path)
+    assert len(client.requests) == 2
+    assert column_mapping._read_cache(cache_path) == {}
+
+
+def test_parse_mapping():
+    headers = ['A', 'B', 'C']
+    fenced = '```json\n' + LLM_REPLY + '\n```'
+    assert column_mapping.parse_mapping(fenced, headers) == {'date': 'A', 'thickness': 'B', 'rejection': 'C'}
+    assert column_mapping.parse_mapping('{"date": "A", "thickness": "A", "rejection": "C"}', headers) is None
+    assert column_mapping.parse_mapping('{"date": "A"}', headers) is None
+    assert column_mapping.parse_mapping('[1, 2, 3]', headers) is None
+    assert column_mapping.parse_mapping('no mapping', headers) is None
+
+
+def test_schema_summary_drops_samples_to_fit_the_token_budget():
+    raw_data = pd.DataFrame({f'Column {i}': [f'value {i} {row}' * 3 for row in range(20)] for i in range(6)})
+    headers = list(raw_data.columns)
+    full = json.loads(column_mapping.schema_summary(raw_data, headers, token_budget=10000))
+    assert all(len(column['samples']) == column_mapping.SAMPLE_VALUES for column in full['columns'])
+
+    text = column_mapping.schema_summary(raw_data, headers, token_budget=200)
+    summary = json.loads(text)
+    assert column_mapping.estimate_tokens(text) <= 200
+    assert [column['header'] for column in summary['columns']] == headers
+    assert all(len(column['samples']) < column_mapping.SAMPLE_VALUES for column in summary['columns'])
+    assert summary['rows'] == 20
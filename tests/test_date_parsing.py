@@ -0,0 +1,34 @@
+from datetime import datetime
+
+import pandas as pd
+
+from date_parsing import TREND_DATE_FORMATS, parse_date_column
+
+
+def test_dominant_format_decides_ambiguous_dates():
+    # 13/03 only parses day first, so 01/03 and 02/03 are read day first too
+    dates, counts = parse_date_column(['01/03/2024', '02/03/2024', '13/03/2024'])
+    assert dates.tolist() == [pd.Timestamp('2024-03-01'), pd.Timestamp('2024-03-02'), pd.Timestamp('2024-03-13')]
+    assert counts == {'%d/%m/%Y': 3, 'unparsed': 0, 'blank': 0}
+
+
+def test_mixed_formats_native_values_and_blanks():
+    values = pd.Series([datetime(2024, 3, 1), ' 2024-03-02 ', 'March 3, 2024', None, '  ', 'soon'], index=range(10, 16))
+    dates, counts = parse_date_column(values)
+    assert list(dates.index) == list(range(10, 16))
+    assert dates.iloc[:3].tolist() == [pd.Timestamp('2024-03-01'), pd.Timestamp('2024-03-02'), pd.Timestamp('2024-03-03')]
+    assert dates.iloc[3:].isna().all()
+    assert counts == {'datetime': 1, '%Y-%m-%d': 1, '%B %d, %Y': 1, 'unparsed': 1, 'blank': 2}
+
+
+def test_datetime_columns_are_returned_as_they_are():
+    values = pd.Series(pd.to_datetime(['2024-03-01', None]))
+    dates, counts = parse_date_column(values)
+    assert dates is values
+    assert counts == {'datetime': 1, 'unparsed': 0, 'blank': 1}
+
+
+def test_trend_formats():
+    dates, counts = parse_date_column(['15/03/2024', '2024-03-16', '03/17/2024'], TREND_DATE_FORMATS)
+    assert dates.dt.day.tolist() == [15, 16, 17]
+    assert counts['unparsed'] == 0
@@ -0,0 +1,63 @@
+from datetime import date
+
+import pytest
+
+import history_store
+import workbook_cache
+from benchmarks.synthetic_workbook import build_sheets, write_ods
+
+
+@pytest.fixture
+def root(tmp_path):
+    workbook_cache.evict()
+    return str(tmp_path / 'history')
+
+
+def workbook(tmp_path, name, month_start=date(2024, 3, 1), size_wise=True, seed=0):
+    sheets = build_sheets(size_rows=40, month_start=month_start, seed=seed)
+    if not size_wise:
+        del sheets['Size wise Rej']
+    path = str(tmp_path / name)
+    write_ods(path, sheets)
+    return path
+
+
+def test_ingest_and_query_months(tmp_path, root):
+    march, written = history_store.ingest_workbook(workbook(tmp_path, 'march.ods'), root=root)
+    april, _ = history_store.ingest_workbook(workbook(tmp_path, 'april.ods', date(2024, 4, 1), seed=1), root=root)
+    assert (march, april) == ('2024-03', '2024-04')
+    assert set(written) == set(history_store.TABLES)
+    for table in history_store.TABLES:
+        assert history_store.available_months(table, root) == ['2024-03', '2024-04']
+
+    trend = history_store.query_trend('2024-03-25', '2024-04-05', root=root)
+    assert trend['Date'].between('2024-03-25', '2024-04-05').all()
+    assert len(trend) == 12
+    assert trend['Date'].is_monotonic_increasing
+
+    _, total_sheets, total_rejection_sheets, _ = history_store.query_breakdown(root=root)
+    _, march_sheets, march_rejections, _ = history_store.query_breakdown('2024-03', '2024-03', root=root)
+    _, april_sheets, april_rejections, _ = history_store.query_breakdown('2024-04', '2024-04', root=root)
+    assert total_sheets == march_sheets + april_sheets
+    assert total_rejection_sheets == pytest.approx(march_rejections + april_rejections)
+
+    cube = history_store.query_size_wise_cube(root=root)
+    # The synthetic sheets include rows the cleaning rejects
+    assert 0 < cube['count'].sum() <= len(history_store.query_size_wise(root=root))
+
+
+def test_reingest_replaces_the_whole_month(tmp_path, root):
+    history_store.ingest_workbook(workbook(tmp_path, 'march.ods'), root=root)
+    _, written = history_store.ingest_workbook(workbook(tmp_path, 'march_v2.ods', size_wise=False, seed=2), root=root)
+    assert 'size_wise' not in written and 'size_wise_cube' not in written
+    assert history_store.available_months('size_wise', root) == []
+    assert history_store.available_months('size_wise_cube', root) == []
+    assert history_store.query_size_wise(root=root) is None
+    assert history_store.available_months('trend', root) == ['2024-03']
+
+
+def test_missing_stamping_sheet(tmp_path, root):
+    path = str(tmp_path / 'empty.ods')
+    write_ods(path, {'Other': [['x']]})
+    with pytest.raises(ValueError):
+        history_store.ingest_workbook(path, root=root)
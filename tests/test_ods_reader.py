@@ -0,0 +1,101 @@
+import zipfile
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import ods_reader
+from benchmarks.synthetic_workbook import ODS_MIMETYPE, ODS_NAMESPACES, write_ods
+
+
+def write_content(path, tables):
+    """An .ods package around hand-written table XML."""
+    content = (f'<?xml version="1.0" encoding="UTF-8"?><office:document-content {ODS_NAMESPACES}>'
+               f'<office:body><office:spreadsheet>{tables}</office:spreadsheet></office:body>'
+               '</office:document-content>')
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('mimetype', ODS_MIMETYPE)
+        archive.writestr('content.xml', content)
+    return str(path)
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = str(tmp_path / 'book.ods')
+    write_ods(path, {
+        'First': [['x'], [1.0]],
+        'Data': [
+            ['Date', 'Thickness', 'Note'],
+            [datetime(2024, 3, 1), 0.5, 'ok'],
+            [datetime(2024, 3, 2), 1.5, None],
+            [None, None, None],
+            [datetime(2024, 3, 4), 2.5, 'late'],
+        ],
+    })
+    return path
+
+
+def test_sheet_names(workbook):
+    assert ods_reader.sheet_names(workbook) == ['First', 'Data']
+
+
+def test_read_sheet_round_trip(workbook):
+    header, frame = ods_reader.read_sheet(workbook, 'Data')
+    assert header == ['Date', 'Thickness', 'Note']
+    assert len(frame) == 4
+    assert frame[0].dtype == 'datetime64[ns]'
+    assert frame[0].iloc[3] == np.datetime64('2024-03-04')
+    assert frame[1].dtype == np.float64
+    assert np.isnan(frame[1].iloc[2])
+    assert frame[2].tolist() == ['ok', None, None, 'late']
+
+
+def test_missing_sheet(workbook):
+    assert ods_reader.read_sheet(workbook, 'Nope') is None
+    assert ods_reader.read_ranges(workbook, 'Nope', {'a': 'A1'}) is None
+
+
+def test_read_ranges(workbook):
+    ranges = ods_reader.read_ranges(workbook, 'Data', {'thickness': 'B2:B5', 'header': 'A1:C1', 'block': 'A2:B3'})
+    assert ranges['thickness'].dtype == np.float64
+    assert ranges['thickness'][[0, 1, 3]].tolist() == [0.5, 1.5, 2.5]
+    assert ranges['header'].tolist() == ['Date', 'Thickness', 'Note']
+    assert ranges['block'].shape == (2, 2)
+
+
+def test_parse_range():
+    assert ods_reader.parse_range('B17:Z47') == (16, 1, 46, 25)
+    assert ods_reader.parse_range('C50') == (49, 2, 49, 2)
+    with pytest.raises(ValueError):
+        ods_reader.parse_range('17B')
+
+
+def test_cell_comments_are_not_cell_text(tmp_path):
+    path = write_content(tmp_path / 'comment.ods', (
+        '<table:table table:name="Sheet">'
+        '<table:table-row>'
+        '<table:table-cell office:value-type="string">'
+        '<office:annotation><text:p>check this</text:p></office:annotation>'
+        '<text:p>Thickness</text:p></table:table-cell>'
+        '</table:table-row>'
+        '</table:table>'))
+    header, _ = ods_reader.read_sheet(path, 'Sheet')
+    assert header == ['Thickness']
+
+
+def test_repeated_cells_and_compressed_whitespace(tmp_path):
+    path = write_content(tmp_path / 'repeat.ods', (
+        '<table:table table:name="Sheet">'
+        '<table:table-row>'
+        '<table:table-cell office:value-type="string"><text:p>a<text:s text:c="2"/>b</text:p></table:table-cell>'
+        '</table:table-row>'
+        '<table:table-row table:number-rows-repeated="2">'
+        '<table:table-cell office:value-type="float" office:value="7" table:number-columns-repeated="2"/>'
+        '<table:table-cell table:number-columns-repeated="1000"/>'
+        '</table:table-row>'
+        '<table:table-row table:number-rows-repeated="1048000"><table:table-cell table:number-columns-repeated="1024"/></table:table-row>'
+        '</table:table>'))
+    header, frame = ods_reader.read_sheet(path, 'Sheet')
+    assert header[0] == 'a  b'
+    assert frame.shape == (2, 2)
+    assert frame.to_numpy().tolist() == [[7.0, 7.0], [7.0, 7.0]]
@@ -0,0 +1,61 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+import spc
+
+# Ten points alternating 10 / 11: mean 10.5, every moving range 1
+BASELINE = [10.0, 11.0] * 5
+
+
+def feed(values, chart=None):
+    chart = chart or spc.IndividualsChart()
+    return [chart.update(value) for value in values], chart
+
+
+def test_running_statistics_match_numpy():
+    values = np.random.default_rng(1).normal(5, 2, 200)
+    _, chart = feed(values)
+    assert math.isclose(chart.mean, values.mean())
+    assert math.isclose(chart.std, values.std(ddof=1))
+    assert math.isclose(chart.moving_range_mean, np.abs(np.diff(values)).mean())
+
+
+def test_no_limits_before_enough_points():
+    results, chart = feed(BASELINE[:spc.MIN_POINTS - 1])
+    assert all(math.isnan(center) and not rules for center, _, _, _, rules in results)
+    assert all(math.isnan(limit) for limit in chart.limits())
+
+
+def test_missing_values_leave_the_chart_unchanged():
+    _, chart = feed(BASELINE)
+    result = chart.update(float('nan'))
+    assert result[4] == [] and chart.n == len(BASELINE)
+
+
+def test_point_beyond_three_sigma():
+    results, _ = feed(BASELINE + [20.0])
+    assert all(not rules for *_, rules in results[:-1])
+    assert 'beyond 3σ' in results[-1][4]
+
+
+def test_eight_points_on_one_side():
+    # The baseline ends above the center line, so the run starts with the first low point
+    results, _ = feed(BASELINE + [9.9] * 8)
+    assert '8 on one side' not in results[-2][4]
+    assert '8 on one side' in results[-1][4]
+
+
+def test_six_points_trending():
+    results, _ = feed(BASELINE + [10.1, 10.2, 10.3, 10.4, 10.5, 10.6])
+    assert '6 trending' not in results[-2][4]
+    assert '6 trending' in results[-1][4]
+
+
+def test_evaluate_continues_from_a_chart():
+    df = pd.DataFrame({'Day': range(30), 'Value': BASELINE * 3})
+    whole, _ = spc.evaluate(df, 'Day', 'Value')
+    head, chart = spc.evaluate(df.iloc[:12], 'Day', 'Value')
+    tail, _ = spc.evaluate(df.iloc[12:], 'Day', 'Value', chart)
+    pd.testing.assert_frame_equal(pd.concat([head, tail], ignore_index=True), whole)
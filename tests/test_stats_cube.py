@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import stats_cube
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(4)
+    return pd.DataFrame({
+        'Date': pd.Timestamp('2024-03-01') + pd.to_timedelta(rng.integers(0, 31, 2000), unit='D'),
+        'Thickness': rng.choice([0.5, 1.5, 2.5], 2000),
+        'Rejection Percentage': rng.random(2000) * 5,
+    })
+
+
+def expected_statistics(rows):
+    grouped = rows.groupby('Thickness')['Rejection Percentage']
+    return pd.DataFrame({
+        'Mean': grouped.mean(), 'Min': grouped.min(), 'Max': grouped.max(), 'Standard Deviation': grouped.std(),
+    }).reset_index()
+
+
+def test_thickness_statistics_match_the_rows(rows):
+    statistics = stats_cube.thickness_statistics(stats_cube.build_cube(rows))
+    pd.testing.assert_frame_equal(statistics, expected_statistics(rows), check_exact=False)
+
+
+def test_merged_cubes_equal_one_cube(rows):
+    whole = stats_cube.build_cube(rows)
+    merged = stats_cube.merge_cubes([stats_cube.build_cube(rows.iloc[:700]), None, stats_cube.build_cube(rows.iloc[700:])])
+    pd.testing.assert_frame_equal(merged, whole, check_exact=False, check_dtype=False)
+    assert stats_cube.merge_cubes([None]) is None
+
+
+def test_filtered_rollup_matches_filtered_rows(rows):
+    cube = stats_cube.filter_cube(stats_cube.build_cube(rows), '2024-03-05', '2024-03-11', [0.5, 2.5])
+    window = rows[rows['Date'].between('2024-03-05', '2024-03-11') & rows['Thickness'].isin([0.5, 2.5])]
+    pd.testing.assert_frame_equal(stats_cube.thickness_statistics(cube).reset_index(drop=True),
+                                  expected_statistics(window), check_exact=False)
+
+
+def test_single_value_has_no_standard_deviation():
+    rows = pd.DataFrame({'Date': [pd.Timestamp('2024-03-01')], 'Thickness': [0.5], 'Rejection Percentage': [1.0]})
+    statistics = stats_cube.rollup(stats_cube.build_cube(rows), ['Thickness'])
+    assert statistics['Count'].tolist() == [1]
+    assert statistics['Standard Deviation'].isna().all()
+
+
+def test_daily_means(rows):
+    means = stats_cube.daily_means(stats_cube.build_cube(rows))
+    expected = rows.groupby(['Date', 'Thickness'])['Rejection Percentage'].mean().unstack()
+    pd.testing.assert_frame_equal(means, expected, check_exact=False, check_names=False)
@@ -0,0 +1,106 @@
+import io
+import os
+
+import numpy as np
+import pytest
+
+import new_proj
+import workbook_cache
+from benchmarks.synthetic_workbook import build_sheets, stamping_rej_rows, write_ods
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    workbook_cache.evict()
+    yield
+    workbook_cache.evict()
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = str(tmp_path / 'book.ods')
+    write_ods(path, build_sheets(size_rows=20))
+    return path
+
+
+def counting(result):
+    calls = []
+
+    def build():
+        calls.append(1)
+        return result
+    return build, calls
+
+
+def test_results_are_reused_while_the_file_is_unchanged(workbook):
+    build, calls = counting('parsed')
+    assert workbook_cache.cached(workbook, 'Stamping Rej', 'trend', build) == 'parsed'
+    assert workbook_cache.cached(workbook, 'Stamping Rej', 'trend', build) == 'parsed'
+    assert len(calls) == 1
+    # Another extraction spec of the same sheet is a separate entry
+    workbook_cache.cached(workbook, 'Stamping Rej', 'breakdown', build)
+    assert len(calls) == 2
+
+
+def test_a_changed_file_is_parsed_again(workbook):
+    build, calls = counting('parsed')
+    workbook_cache.cached(workbook, 'Stamping Rej', 'trend', build)
+    write_ods(workbook, build_sheets(size_rows=20, seed=1))
+    stat = os.stat(workbook)
+    os.utime(workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    workbook_cache.cached(workbook, 'Stamping Rej', 'trend', build)
+    assert len(calls) == 2
+
+
+def test_uploads_are_keyed_by_content(workbook):
+    with open(workbook, 'rb') as f:
+        data = f.read()
+    build, calls = counting('parsed')
+    workbook_cache.cached(io.BytesIO(data), 'Stamping Rej', 'trend', build)
+    workbook_cache.cached(data, 'Stamping Rej', 'trend', build)
+    assert len(calls) == 1
+
+
+def test_missing_results_are_not_cached(workbook):
+    build, calls = counting(None)
+    assert workbook_cache.cached(workbook, 'Nope', 'trend', build) is None
+    workbook_cache.cached(workbook, 'Nope', 'trend', build)
+    assert len(calls) == 2
+
+
+def test_evict(workbook):
+    build, calls = counting('parsed')
+    workbook_cache.cached(workbook, 'Stamping Rej', 'trend', build)
+    workbook_cache.evict(workbook)
+    workbook_cache.cached(workbook, 'Stamping Rej', 'trend', build)
+    assert len(calls) == 2
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = workbook_cache.WorkbookCache(max_bytes=2500)
+    for key in 'abc':
+        cache.put(key, np.zeros(100))
+    cache.get('a')
+    cache.put('d', np.zeros(100))
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    cache.put('huge', np.zeros(1000))
+    assert cache.get('huge') is None and cache.get('a') is not None
+
+
+def test_skipped_trend_rows_are_part_of_the_cached_result(tmp_path):
+    rows = stamping_rej_rows()
+    rows[18][25] = 'n/a'
+    rows[20][1] = 'someday'
+    rows[22][1] = None
+    path = str(tmp_path / 'trend.ods')
+    write_ods(path, {'Stamping Rej': rows})
+
+    trend_df, skipped_df = new_proj.load_rejection_data(path)
+    assert skipped_df.to_dict('list') == {
+        'Sheet Row': [19, 21, 23],
+        'Reason': ["Invalid rejection value 'n/a'", "Invalid date format 'someday'", 'No date value'],
+    }
+    assert len(trend_df) == 28
+    # A later session gets the same report from the cache
+    assert new_proj.load_rejection_data(path)[1] is skipped_df
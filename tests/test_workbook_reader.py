@@ -0,0 +1,97 @@
+import csv
+import io
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import workbook_reader
+from benchmarks.synthetic_workbook import write_ods, write_xlsx
+
+ROWS = [
+    ['Date', 'Thickness', 'Note'],
+    [datetime(2024, 3, 1), 0.5, 'ok'],
+    [datetime(2024, 3, 2), 1.5, None],
+    [datetime(2024, 3, 4), 2.5, 'late'],
+]
+
+
+@pytest.fixture
+def workbooks(tmp_path):
+    sheets = {'First': [['x']], 'Data': ROWS}
+    paths = {'ods': str(tmp_path / 'book.ods'), 'xlsx': str(tmp_path / 'book.xlsx'), 'csv': str(tmp_path / 'book.csv')}
+    write_ods(paths['ods'], sheets)
+    write_xlsx(paths['xlsx'], sheets)
+    with open(paths['csv'], 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        for row in ROWS:
+            writer.writerow(['' if value is None else value for value in row])
+    return paths
+
+
+def upload(path, name=None):
+    with open(path, 'rb') as f:
+        data = io.BytesIO(f.read())
+    if name:
+        data.name = name
+    return data
+
+
+def test_detect_format(workbooks):
+    for fmt, path in workbooks.items():
+        assert workbook_reader.detect_format(path) == fmt
+        # Without a name the content decides
+        assert workbook_reader.detect_format(upload(path)) == fmt
+    assert workbook_reader.detect_format(upload(workbooks['ods'], 'March.ODS')) == 'ods'
+
+
+def test_sheet_names(workbooks):
+    assert workbook_reader.sheet_names(workbooks['ods']) == ['First', 'Data']
+    assert workbook_reader.sheet_names(upload(workbooks['xlsx'])) == ['First', 'Data']
+    assert workbook_reader.sheet_names(workbooks['csv']) == [None]
+
+
+@pytest.mark.parametrize('fmt', ['xlsx', 'csv'])
+def test_read_sheet_matches_ods(workbooks, fmt):
+    header, frame = workbook_reader.read_sheet(workbooks['ods'], 'Data')
+    other_header, other_frame = workbook_reader.read_sheet(upload(workbooks[fmt]), 'Data')
+    assert other_header == header
+    assert len(other_frame) == len(frame)
+    assert other_frame[2].tolist() == frame[2].tolist()
+    if fmt == 'xlsx':
+        pd.testing.assert_frame_equal(other_frame, frame)
+    else:
+        # CSV cells are text; the views parse them the same way as the ODS values
+        assert pd.to_numeric(other_frame[1]).tolist() == frame[1].tolist()
+        assert pd.to_datetime(other_frame[0]).tolist() == frame[0].tolist()
+
+
+def test_missing_sheet(workbooks):
+    assert workbook_reader.read_sheet(workbooks['xlsx'], 'Nope') is None
+    # A CSV file stands in for whichever sheet is asked for
+    assert workbook_reader.read_sheet(workbooks['csv'], 'Nope') is not None
+
+
+def test_uploads_stay_open(workbooks):
+    data = upload(workbooks['csv'])
+    workbook_reader.read_sheet(data, 'Data')
+    assert not data.closed
+    assert workbook_reader.read_sheet(data, 'Data')[0] == ['Date', 'Thickness', 'Note']
+
+
+@pytest.mark.parametrize('fmt', ['ods', 'xlsx', 'csv'])
+def test_read_ranges(workbooks, fmt):
+    ranges = workbook_reader.read_ranges(upload(workbooks[fmt]), 'Data', {'thickness': 'B2:B4', 'note': 'C2:C4', 'header': 'A1:C1'})
+    assert ranges['header'].tolist() == ['Date', 'Thickness', 'Note']
+    assert ranges['note'].tolist() == ['ok', None, 'late']
+    assert pd.to_numeric(ranges['thickness']).tolist() == [0.5, 1.5, 2.5]
+    if fmt != 'csv':
+        assert ranges['thickness'].dtype == np.float64
+
+
+def test_ranges_past_the_last_row_are_empty(workbooks):
+    ranges = workbook_reader.read_ranges(workbooks['xlsx'], 'Data', {'below': 'B10:B11'})
+    assert ranges['below'].shape == (2,)
+    assert pd.isna(ranges['below']).all()
+    assert workbook_reader.read_ranges(workbooks['xlsx'], 'Nope', {'a': 'A1'}) is None
@@ -0,0 +1,68 @@
+import argparse
+import importlib
+import os
+import sys
+
+import instrumentation
+import workbook_reader
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+# Imported on first use by the views; anthropic alone takes over a second
+HEAVY_MODULES = ('plotly.express', 'anthropic', 'openpyxl', 'pyarrow')
+PAGE_MODULES = ('new_proj', 'finale_2', 'size_wise_rej', 'main_final')
+
+
+def preload_modules(modules=HEAVY_MODULES + PAGE_MODULES):
+    """Import the modules the views need, skipping optional ones that are not installed."""
+    for name in modules:
+        with instrumentation.stage(f'import {name}'):
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass
+
+
+def preparse_workbook(path):
+    """
+    Fill the workbook cache with what the views read from `path`: the trend,
+    the breakdown and the raw 'Size wise Rej' rows. The column mapping is
+    left to the page, as it may need the LLM.
+    """
+    import finale_2
+    import new_proj
+    import size_wise_rej
+    with instrumentation.stage('trend'):
+        new_proj.load_rejection_data(path)
+    with instrumentation.stage('breakdown'):
+        finale_2.load_rejection_data(path)
+    with instrumentation.stage('size wise'):
+        size_wise_rej.load_raw_sheet_data(path)
+
+
+@instrumentation.instrumented('warmup', render=False)
+def warm_up(path=None):
+    """Preload the modules and pre-parse the workbook at `path` (workbook_reader.data_path() by default), if it exists."""
+    preload_modules()
+    path = path or workbook_reader.data_path()
+    if os.path.exists(path):
+        preparse_workbook(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Warm up, then serve app.py from the same process. '
+                    'Other options are passed on to streamlit run (e.g. --server.port 8501).')
+    parser.add_argument('--workbook', default=None,
+                        help='Workbook to pre-parse (default: workbook_reader.data_path())')
+    args, streamlit_args = parser.parse_known_args(argv)
+
+    warm_up(args.workbook)
+
+    # The server must share this process for the imports and the cache to be reused
+    from streamlit.web import cli
+    sys.argv = ['streamlit', 'run', APP] + streamlit_args
+    sys.exit(cli.main())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import workbook_reader
+
+# Memory budget for parsed results shared by every session in the process
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+HASH_CHUNK = 1024 * 1024
+
+
+def _estimate_size(value):
+    """Approximate memory held by a cached value."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        size = value.memory_usage(deep=True)
+        return int(size.sum()) if isinstance(value, pd.DataFrame) else int(size)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class WorkbookCache:
+    """Thread-safe LRU store of parsed workbook data bounded by a byte budget."""
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        size = _estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                # Never let one oversized result flush everything else
+                return
+            self._entries[key] = (value, size)
+            self._bytes += size
+            self._trim()
+
+    def _trim(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+
+    def resize(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._trim()
+
+    def evict(self, digests=None):
+        """Drop every entry keyed by one of `digests` (content or sheet hashes), or all entries."""
+        with self._lock:
+            for key in list(self._entries):
+                if digests is None or key[0] in digests:
+                    self._bytes -= self._entries.pop(key)[1]
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+_cache = WorkbookCache()
+_path_hashes = {}
+_path_sheet_hashes = {}
+_path_lock = threading.Lock()
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def content_hash(source):
+    """
+    Hash the content of a workbook given as a path, bytes or binary file object.
+    Path hashes are remembered per (mtime, size) so unchanged files are not re-read.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.blake2b(source, digest_size=16).hexdigest()
+    if hasattr(source, 'getbuffer'):
+        return hashlib.blake2b(source.getbuffer(), digest_size=16).hexdigest()
+
+    path = os.fspath(source)
+    signature = _signature(path)
+    with _path_lock:
+        known = _path_hashes.get(path)
+    if known and known[0] == signature:
+        return known[1]
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    digest = digest.hexdigest()
+    with _path_lock:
+        _path_hashes[path] = (signature, digest)
+    return digest
+
+
+def sheet_hashes(path):
+    """Per-sheet content hashes of a workbook file, remembered per (mtime, size)."""
+    path = os.fspath(path)
+    signature = _signature(path)
+    with _path_lock:
+        known = _path_sheet_hashes.get(path)
+    if known and known[0] == signature:
+        return known[1]
+    digests = workbook_reader.sheet_digests(path)
+    with _path_lock:
+        _path_sheet_hashes[path] = (signature, digests)
+    return digests
+
+
+def sheet_hash(source, sheet_name):
+    """
+    Hash identifying the content of one sheet. For files it changes only when
+    that sheet changes, so editing one sheet keeps the results of the others.
+    Buffers (uploads) and formats without separable sheets use the content hash.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        digest = sheet_hashes(source).get(sheet_name)
+        if digest:
+            return digest
+    return content_hash(source)
+
+
+def cached(source, sheet_name, spec, build):
+    """
+    Return the result of build() for this sheet content and extraction spec,
+    parsing only on a miss. None results are not cached so that callers keep
+    reporting missing sheets. Cached values are shared between sessions and
+    must not be modified in place.
+    """
+    key = (sheet_hash(source, sheet_name), sheet_name, spec)
+    value = _cache.get(key)
+    if value is None:
+        value = build()
+        if value is not None:
+            _cache.put(key, value)
+    return value
+
+
+def evict(source=None):
+    """Explicitly drop the cached results of one workbook, or of all workbooks."""
+    if source is None:
+        _cache.evict()
+        return
+    digests = {content_hash(source)}
+    if isinstance(source, (str, os.PathLike)):
+        digests.update(sheet_hashes(source).values())
+    _cache.evict(digests)
+
+
+def set_budget(max_bytes):
+    """Change the memory budget, evicting least recently used entries if needed."""
+    _cache.resize(max_bytes)
+
+
+def stats():
+    return _cache.stats()
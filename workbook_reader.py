@@ -0,0 +1,231 @@
+import csv
+import hashlib
+import io
+import os
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import date, datetime, time
+from xml.sax.saxutils import unescape
+
+import ods_reader
+
+# Workbook the dashboards show unless SAHYADRI_WORKBOOK points them at another one
+DEFAULT_DATA_PATH = '/home/galactose/Downloads/sahyadri_march.ods'
+FORMATS = ('ods', 'xlsx', 'csv')
+EXTENSIONS = {'.ods': 'ods', '.xlsx': 'xlsx', '.xlsm': 'xlsx', '.csv': 'csv'}
+ODS_MIMETYPE = b'application/vnd.oasis.opendocument.spreadsheet'
+ODS_TABLE_START = b'<table:table table:name="'
+XLSX_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+XLSX_REL_ID = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+XLSX_RELS_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+
+def data_path():
+    """The workbook the dashboards show, looked up on each call so SAHYADRI_WORKBOOK may be set after import."""
+    return os.environ.get('SAHYADRI_WORKBOOK', DEFAULT_DATA_PATH)
+
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return source
+
+
+def detect_format(source):
+    """
+    'ods', 'xlsx' or 'csv' for a path or a binary file object.
+    The file extension decides when there is one (uploads keep their name),
+    otherwise the content is sniffed.
+    """
+    name = source if isinstance(source, (str, os.PathLike)) else getattr(source, 'name', None)
+    if name:
+        fmt = EXTENSIONS.get(os.path.splitext(os.fspath(name))[1].lower())
+        if fmt:
+            return fmt
+    if not zipfile.is_zipfile(_rewind(source)):
+        return 'csv'
+    with zipfile.ZipFile(_rewind(source)) as archive:
+        if 'mimetype' in archive.namelist() and archive.read('mimetype').strip() == ODS_MIMETYPE:
+            return 'ods'
+        return 'xlsx'
+
+
+def _xlsx_value(value):
+    """Match the cell types the ODS reader produces (float, datetime, bool, str)."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (bool, float, str, datetime)):
+        return value
+    if isinstance(value, int):
+        return float(value)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, time):
+        return value.isoformat()
+    return str(value)
+
+
+def _trimmed(values):
+    """Drop trailing empty cells, as the ODS reader does."""
+    end = len(values)
+    while end and values[end - 1] is None:
+        end -= 1
+    return values[:end]
+
+
+def _xlsx_rows(source, sheet_name, nrows=None):
+    """
+    Yield None when the sheet is found, then a list of values per row.
+    openpyxl's read-only mode streams the one worksheet's XML; other sheets are never parsed.
+    """
+    from openpyxl import load_workbook
+    workbook = load_workbook(_rewind(source), read_only=True, data_only=True)
+    try:
+        if sheet_name not in workbook.sheetnames:
+            return
+        yield None
+        for row in workbook[sheet_name].iter_rows(max_row=nrows, values_only=True):
+            yield _trimmed([_xlsx_value(value) for value in row])
+    finally:
+        workbook.close()
+
+
+def _csv_rows(source, nrows=None):
+    """
+    Yield None, then a list of string values (None for blank cells) per row.
+    A CSV export holds a single sheet, so it stands in for whichever sheet is asked for.
+    """
+    is_path = isinstance(source, (str, os.PathLike))
+    if is_path:
+        text = open(source, encoding='utf-8-sig', newline='')
+    else:
+        text = io.TextIOWrapper(_rewind(source), encoding='utf-8-sig', newline='')
+    try:
+        yield None
+        for index, row in enumerate(csv.reader(text)):
+            if nrows is not None and index >= nrows:
+                break
+            yield _trimmed([value if value.strip() else None for value in row])
+    finally:
+        if is_path:
+            text.close()
+        else:
+            # Leave the caller's buffer open
+            text.detach()
+
+
+def _rows(source, sheet_name, nrows=None):
+    fmt = detect_format(source)
+    if fmt == 'xlsx':
+        return _xlsx_rows(source, sheet_name, nrows)
+    return _csv_rows(source, nrows)
+
+
+def sheet_names(source):
+    """List the sheet names in document order; a CSV file has one unnamed sheet."""
+    fmt = detect_format(source)
+    if fmt == 'ods':
+        return ods_reader.sheet_names(_rewind(source))
+    if fmt == 'xlsx':
+        from openpyxl import load_workbook
+        workbook = load_workbook(_rewind(source), read_only=True)
+        names = workbook.sheetnames
+        workbook.close()
+        return names
+    return [None]
+
+
+def read_sheet(source, sheet_name, header_row=0):
+    """
+    ods_reader.read_sheet for any supported format: (header_values, frame)
+    with typed positional columns, or None if the sheet is missing.
+    """
+    if detect_format(source) == 'ods':
+        return ods_reader.read_sheet(_rewind(source), sheet_name, header_row)
+    rows = _rows(source, sheet_name)
+    if next(rows, False) is False:
+        return None
+    return ods_reader.frame_from_rows(((values, 1) for values in rows), header_row)
+
+
+
+def read_ranges(source, sheet_name, ranges):
+    """
+    ods_reader.read_ranges for any supported format: {name: typed array}
+    for the requested cell ranges, or None if the sheet is missing.
+    XLSX and CSV stop reading after the last requested row.
+    """
+    if detect_format(source) == 'ods':
+        return ods_reader.read_ranges(_rewind(source), sheet_name, ranges)
+    last_row = max(ods_reader.parse_range(reference)[2] for reference in ranges.values())
+    rows = _rows(source, sheet_name, nrows=last_row + 1)
+    if next(rows, False) is False:
+        return None
+    return ods_reader.project_rows(((values, 1) for values in rows), ranges)
+
+
+def _ods_sheet_digests(archive):
+    """Hash the XML of every table in content.xml, streaming it in chunks."""
+    digests = {}
+    name, digest = None, None
+    buffer = b''
+    with archive.open('content.xml') as content:
+        for chunk in iter(lambda: content.read(ods_reader.CHUNK_SIZE), b''):
+            buffer += chunk
+            while True:
+                start = buffer.find(ODS_TABLE_START)
+                end = buffer.find(b'"', start + len(ODS_TABLE_START)) if start >= 0 else -1
+                if end < 0:
+                    break
+                if digest is not None:
+                    digest.update(buffer[:start])
+                    digests[name] = digest.hexdigest()
+                name = unescape(buffer[start + len(ODS_TABLE_START):end].decode('utf-8'), {'&quot;': '"', '&apos;': "'"})
+                digest = hashlib.blake2b(digest_size=16)
+                digest.update(buffer[start:end])
+                buffer = buffer[end:]
+            # Hold back whatever could be the beginning of the next table's start tag
+            keep = start if start >= 0 else max(len(buffer) - len(ODS_TABLE_START) + 1, 0)
+            if digest is not None:
+                digest.update(buffer[:keep])
+            buffer = buffer[keep:]
+    if digest is not None:
+        digest.update(buffer)
+        digests[name] = digest.hexdigest()
+    return digests
+
+
+def _xlsx_sheet_digests(archive):
+    """
+    Identify every worksheet part by the CRC and size recorded in the zip
+    directory, so nothing is decompressed. Shared strings are part of every
+    sheet's digest because a changed text can leave the sheet XML unchanged.
+    """
+    workbook = ET.fromstring(archive.read('xl/workbook.xml'))
+    rels = ET.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    targets = {rel.get('Id'): rel.get('Target') for rel in rels.iter(XLSX_RELS_NS + 'Relationship')}
+    infos = {info.filename: info for info in archive.infolist()}
+    shared = infos.get('xl/sharedStrings.xml')
+    shared = f'{shared.CRC:08x}{shared.file_size}' if shared else ''
+    digests = {}
+    for sheet in workbook.iter(XLSX_MAIN_NS + 'sheet'):
+        target = targets.get(sheet.get(XLSX_REL_ID), '')
+        part = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+        info = infos.get(part)
+        if info is not None:
+            digests[sheet.get('name')] = f'{info.CRC:08x}{info.file_size}{shared}'
+    return digests
+
+
+def sheet_digests(source):
+    """
+    {sheet name: digest of its content} for an .ods or .xlsx workbook, to tell
+    which sheets changed between two versions of a file. Empty for CSV or
+    when the sheets cannot be told apart.
+    """
+    fmt = detect_format(source)
+    if fmt == 'csv':
+        return {}
+    with zipfile.ZipFile(_rewind(source)) as archive:
+        return _ods_sheet_digests(archive) if fmt == 'ods' else _xlsx_sheet_digests(archive)
@@ -0,0 +1,68 @@
+import os
+import time
+import zipfile
+
+import streamlit as st
+
+import workbook_cache
+
+# How often a watched workbook's modification time is checked
+POLL_SECONDS = 2.0
+
+
+def changed_sheets(previous, current):
+    """Names of the sheets added, removed or edited between two sheet_hashes() results."""
+    return sorted(name for name in previous.keys() | current.keys() if previous.get(name) != current.get(name))
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        # The file is briefly missing while some editors save it
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _poll(path, sheets, state_key):
+    """Compare the workbook with the last check and rerun the page when one of `sheets` changed."""
+    signature, hashes = st.session_state[f'{state_key}_seen']
+    st.caption(f"Watching {os.path.basename(path)} · checked {time.strftime('%H:%M:%S')}")
+    current_signature = _signature(path)
+    if current_signature is None or current_signature == signature:
+        return
+    try:
+        current = workbook_cache.sheet_hashes(path)
+    except (OSError, zipfile.BadZipFile):
+        # Still being written; try again on the next poll
+        return
+    st.session_state[f'{state_key}_seen'] = current_signature, current
+    changed = [name for name in changed_sheets(hashes, current) if name in sheets]
+    if changed:
+        st.session_state[f'{state_key}_updated'] = changed
+        st.rerun(scope='app')
+
+
+def watch(path, sheets, key, poll_seconds=POLL_SECONDS):
+    """
+    Sidebar toggle that keeps the page in sync with a workbook being edited.
+
+    When it is on, a fragment checks the file every `poll_seconds` without
+    holding the script thread, so widgets and other fragments stay responsive.
+    As soon as one of `sheets` changes the page reruns; the workbook cache is
+    keyed by sheet content, so only the changed sheets are re-extracted and
+    everything else comes from the cache. Edits to other sheets do not
+    trigger a rerun.
+    """
+    state_key = f'watch_{key}'
+    updated = st.session_state.pop(f'{state_key}_updated', None)
+    if updated:
+        st.toast('🔄 Updated from the workbook: ' + ', '.join(updated))
+    if not st.sidebar.checkbox('👀 Watch workbook for changes', key=state_key):
+        return
+
+    # The baseline is the file as this full run saw it
+    signature = _signature(path)
+    st.session_state[f'{state_key}_seen'] = signature, workbook_cache.sheet_hashes(path) if signature else {}
+    with st.sidebar:
+        st.fragment(_poll, run_every=poll_seconds)(path, sheets, state_key)